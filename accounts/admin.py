@@ -6,6 +6,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.sessions.models import Session
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import redirect
 from django.templatetags.static import static
 from django.urls import reverse
@@ -19,6 +21,7 @@ from allauth.account.models import EmailAddress
 # Internal imports
 from cart.admin import CartEntryInline
 from checkout.admin import OrderInline, OrderAdmin
+from checkout.models import Order
 from store.models import ContactMessage
 from .models import UserProfile
 
@@ -131,30 +134,54 @@ class CustomSessionAdmin(ModelAdmin):
 class CustomUserAdmin(UserAdmin):
     '''
     Custom User admin to include EmailAddress and CartEntry inlines.
+
+    The changelist reads the primary email, order count and last order
+    date from subqueries of the user query, so a page costs the same
+    number of queries whatever its size.
     '''
     readonly_fields = ('last_login', 'date_joined')
     inlines = [UserProfileInline, EmailAddressInline, CartEntryInline,
                OrderInline]
+    search_fields = UserAdmin.search_fields + ('primary_email',)
 
     def get_list_display(self, request):
         '''
         Dynamically determine the list_display fields based on the user's role.
         '''
         if request.user.is_superuser:
-            return ('username', 'get_primary_email', 'is_staff',
-                    'is_superuser', 'is_active')
-        return ('username', 'get_primary_email', 'is_active')
+            return ('username', 'get_primary_email', 'get_order_count',
+                    'get_last_order_date', 'is_staff', 'is_superuser',
+                    'is_active')
+        return ('username', 'get_primary_email', 'get_order_count',
+                'get_last_order_date', 'is_active')
 
     def get_primary_email(self, obj):
         '''
         Retrieves the primary email address for the user.
         '''
-        primary_email = EmailAddress.objects.filter(user=obj, primary=True).first()
-        if primary_email:
-            return primary_email.email
-        return 'No primary email'
+        return obj.primary_email or 'No primary email'
 
     get_primary_email.short_description = 'Primary Email'
+    get_primary_email.admin_order_field = 'primary_email'
+
+    def get_order_count(self, obj):
+        '''
+        Retrieves the number of orders placed by the user.
+        '''
+        return obj.order_count
+
+    get_order_count.short_description = 'Orders'
+    get_order_count.admin_order_field = 'order_count'
+
+    def get_last_order_date(self, obj):
+        '''
+        Retrieves the date of the user's latest order.
+        '''
+        return obj.last_order_date
+
+    get_last_order_date.short_description = 'Last Order'
+    get_last_order_date.admin_order_field = 'last_order_date'
+    get_last_order_date.empty_value_display = 'No orders'
 
     def get_form(self, request, obj=None, **kwargs):
         '''
@@ -166,12 +193,33 @@ class CustomUserAdmin(UserAdmin):
         '''
         Limit the users displayed in the admin list to non-staff users for staff.
         Superusers see all users.
+
+        Users are annotated with their primary email, order count and
+        last order date, for display, sorting and search.
         '''
         qs = super().get_queryset(request)
         if request.user.is_staff and not request.user.is_superuser:
             # Restrict staff users to only see non-staff users
-            return qs.filter(is_staff=False)
-        return qs
+            qs = qs.filter(is_staff=False)
+
+        orders = Order.objects.filter(
+            user=OuterRef('pk')
+        ).order_by().values('user')
+
+        return qs.annotate(
+            primary_email=Subquery(
+                EmailAddress.objects.filter(
+                    user=OuterRef('pk'), primary=True
+                ).values('email')[:1]
+            ),
+            order_count=Coalesce(
+                Subquery(orders.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+            last_order_date=Subquery(
+                orders.annotate(latest=Max('date')).values('latest')
+            ),
+        )
 
     def get_fieldsets(self, request, obj=None):
         '''
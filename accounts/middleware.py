@@ -1,11 +1,47 @@
 # Django imports
 from django.contrib import messages
 from django.utils.deprecation import MiddlewareMixin
-from django.conf import settings
-from django.urls import resolve, reverse
+from django.urls import reverse
 from django.shortcuts import redirect
 from django.contrib.auth import REDIRECT_FIELD_NAME
 
+# URL names anonymous users may access. Every other view, including the
+# views Django and allauth mark as login_not_required, redirects to login.
+PUBLIC_URL_NAMES = frozenset((
+    'about',
+    'account_confirm_email',
+    'account_email_verification_sent',
+    'account_login',
+    'account_reset_password',
+    'account_reset_password_done',
+    'account_reset_password_from_key',
+    'account_signup',
+    'account_verified_email_required',
+    'add_to_cart',
+    'cache_checkout_data',
+    'cart',
+    'custom_401',
+    'custom_404',
+    'delete_cart',
+    'help',
+    'home',
+    'privacy_policy',
+    'product',
+    'product_detail',
+    'product_image',
+    'product_list',
+    'product_reviews',
+    'render_toast',
+    'reset_cookie_consent',
+    'robots_txt',
+    'set_cookie_consent',
+    'sitemap_xml',
+    'update_cart',
+    'validate_data',
+    'webhook',
+    'wireframes',
+))
+
 
 class LoginRequiredMiddleware(MiddlewareMixin):
     '''
@@ -14,89 +50,100 @@ class LoginRequiredMiddleware(MiddlewareMixin):
     and operations.
 
     Handles redirects for login and unauthorized access based
-    on user permissions.
+    on user permissions. Runs natively in both WSGI and ASGI stacks, so
+    it never moves async requests to a thread.
     '''
 
-    def process_view(self, request, view_func, view_args, view_kwargs):
+    def __init__(self, get_response):
         '''
-        Process each view to enforce authentication and authorization rules.
-        Redirects users to login or 401 pages when necessary.
+        Initializes the middleware, switching to the async access check
+        when the rest of the stack is async.
+
+        Args:
+            get_response (function): The next middleware or view in the chain.
+        '''
+        super().__init__(get_response)
+        if self.async_mode:
+            self.process_view = self.aprocess_view
+
+    def check_access(self, request, user, view_func):
+        '''
+        Apply the authentication and authorization rules to a request.
 
         Args:
             request: The current request object.
+            user: The user making the request.
             view_func: The view function being accessed.
-            view_args: Positional arguments for the view.
-            view_kwargs: Keyword arguments for the view.
 
         Returns:
-            None or HttpResponse: Returns a redirect or forbidden response
-            based on user authentication and authorization status.
+            tuple: The redirect response or None, and the referring page
+            to remember for after login, or None.
         '''
-        current_url = resolve(request.path_info).url_name
+        match = request.resolver_match
 
         # Check if the user is not authenticated
-        if not request.user.is_authenticated:
+        if not user.is_authenticated:
             # Allow access to certain URLs without authentication
-            allowed_urls = [
-                'about',
-                'account_confirm_email',
-                'account_email_verification_sent',
-                'account_login',
-                'account_reset_password',
-                'account_reset_password_done',
-                'account_reset_password_from_key',
-                'account_signup',
-                'account_verified_email_required',
-                'add_to_cart',
-                'cache_checkout_data',
-                'cart',
-                'custom_401',
-                'custom_404',
-                'delete_cart',
-                'help',
-                'home',
-                'privacy_policy',
-                'product',
-                'product_detail',
-                'product_list',
-                'render_toast',
-                'reset_cookie_consent',
-                'robots_txt',
-                'set_cookie_consent',
-                'sitemap_xml',
-                'update_cart',
-                'validate_data',
-                'webhook',
-                'wireframes',
-            ]
-
-            if current_url not in allowed_urls:
+            if match.url_name not in PUBLIC_URL_NAMES:
                 # Redirect due to middleware restriction
                 messages.warning(request, 'Please log in to continue.')
                 return redirect(
                     f'{reverse("account_login")}?{REDIRECT_FIELD_NAME}='
                     f'{request.get_full_path()}'
-                )
-            elif current_url == 'account_login' and 'next' not in request.GET:
+                ), None
+            elif (
+                match.url_name == 'account_login' and
+                'next' not in request.GET
+            ):
                 # Direct request to login page, capture the referring page
                 previous_page = request.META.get('HTTP_REFERER', '/')
                 if (
                     previous_page and previous_page !=
                     request.build_absolute_uri(reverse('account_login'))
                 ):
-                    request.session['previous_page'] = previous_page
+                    return None, previous_page
 
-        # Enforce superuser access for the admin panel
-        elif request.path.startswith(reverse('admin:index')):
-            if not request.user.is_authenticated:
-                # Redirect unauthenticated users to login
-                return redirect(
-                    f'{reverse("account_login")}?{REDIRECT_FIELD_NAME}='
-                    f'{request.get_full_path()}'
-                )
-            elif not (request.user.is_superuser or request.user.is_staff):
-                # Redirect non-superusers to custom 401 page
-                return redirect('custom_401')
+        # Enforce staff access for the admin panel
+        elif 'admin' in match.namespaces:
+            if not (user.is_superuser or user.is_staff):
+                # Redirect non-staff users to custom 401 page
+                return redirect('custom_401'), None
 
         # Allow access if no restrictions are met
-        return None
+        return None, None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        '''
+        Process each view to enforce authentication and authorization rules.
+        Redirects users to login or 401 pages when necessary.
+
+        Args:
+            request: The current request object.
+            view_func: The view function being accessed.
+            view_args: Positional arguments for the view.
+            view_kwargs: Keyword arguments for the view.
+
+        Returns:
+            None or HttpResponse: Returns a redirect or forbidden response
+            based on user authentication and authorization status.
+        '''
+        response, previous_page = self.check_access(
+            request, request.user, view_func
+        )
+        if previous_page:
+            request.session['previous_page'] = previous_page
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        '''
+        Async version of process_view, loading the user and session
+        without blocking the event loop.
+        '''
+        user = await request.auser()
+        # Share the loaded user with sync code reading request.user
+        request.user = user
+        response, previous_page = self.check_access(request, user, view_func)
+        if previous_page:
+            await request.session.aset('previous_page', previous_page)
+        return response
@@ -0,0 +1,69 @@
+# Django imports
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+# Third-party imports
+from allauth.account.models import EmailAddress
+
+# Internal imports
+from checkout.models import Order
+
+User = get_user_model()
+
+
+class UserAdminChangelistTests(TestCase):
+    '''
+    The user changelist loads its email and order columns through
+    annotations, so its query count does not grow with the users shown.
+    '''
+    # Session, logged in user, group filter, the two changelist counts
+    # and the page of users
+    expected_queries = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+
+    def add_users(self, count):
+        '''
+        Create users, each with a primary email address and an order.
+        '''
+        start = User.objects.count()
+        for index in range(start, start + count):
+            user = User.objects.create_user(
+                f'user{index}', f'user{index}@example.com', 'password'
+            )
+            EmailAddress.objects.create(
+                user=user, email=user.email, primary=True, verified=True
+            )
+            Order.objects.create(
+                user=user,
+                full_name=user.username,
+                email=user.email,
+                phone_number='0000000000',
+                country='IE',
+                town_or_city='Dublin',
+                street_address1='1 Main Street',
+            )
+
+    def get_changelist(self):
+        response = self.client.get(
+            reverse('admin:auth_user_changelist'), secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.client.force_login(self.admin)
+
+        self.add_users(5)
+        with self.assertNumQueries(self.expected_queries):
+            self.get_changelist()
+
+        self.add_users(45)
+        with self.assertNumQueries(self.expected_queries):
+            response = self.get_changelist()
+        self.assertContains(response, 'user49@example.com')
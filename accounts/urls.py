@@ -8,7 +8,11 @@ from .views import (
     CustomLoginView,
     ProfileView
 )
-from checkout.views import OrderDetailView, OrderListView
+from checkout.views import (
+    OrderDetailView,
+    OrderListView,
+    OrderListPageView
+)
 
 # Define the URL patterns for the 'accounts' app
 urlpatterns = [
@@ -44,6 +48,11 @@ urlpatterns = [
         OrderListView.as_view(),
         name='account_orders'
     ),
+    path(
+        'orders/page/',
+        OrderListPageView.as_view(),
+        name='account_orders_page'
+    ),
     path(
         'orders/<str:order_id>',
         OrderDetailView.as_view(),
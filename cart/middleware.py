@@ -1,11 +1,18 @@
 # Django imports
 from django.shortcuts import redirect
 
+# Third-party imports
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
 
 class CartRedirectMiddleware:
     '''
     Middleware to handle post-login redirection to the cart choice page.
+    Runs natively in both WSGI and ASGI stacks.
     '''
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         '''
         Initializes the middleware with the provided response handler.
@@ -14,6 +21,9 @@ class CartRedirectMiddleware:
             get_response (function): The next middleware or view in the chain.
         '''
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
         '''
@@ -26,6 +36,9 @@ class CartRedirectMiddleware:
             HttpResponse: The response after handling the post-login
             redirection.
         '''
+        if self.async_mode:
+            return self.__acall__(request)
+
         response = self.get_response(request)
 
         if (
@@ -37,3 +50,19 @@ class CartRedirectMiddleware:
                 return redirect(redirect_url)
 
         return response
+
+    async def __acall__(self, request):
+        '''
+        Async version of __call__, used when the rest of the stack is async.
+        '''
+        response = await self.get_response(request)
+
+        user = await request.auser()
+        if user.is_authenticated:
+            redirect_url = await request.session.apop(
+                'post_login_redirect', None
+            )
+            if redirect_url:
+                return redirect(redirect_url)
+
+        return response
@@ -2,14 +2,169 @@ import json
 
 # Django imports
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+# Third-party imports
+from asgiref.sync import sync_to_async
 
 # Internal imports
 from product.models import Product, ProductVariant
 from .models import CartEntry
 
 
+def parse_session_cart(session_cart):
+    '''
+    Read the quantities of a session cart, skipping malformed items.
+
+    Args:
+        session_cart (dict): Quantities by size, by product ID.
+
+    Returns:
+        dict: Positive quantities by (product ID, size).
+    '''
+    quantities = {}
+    for product_id, sizes in session_cart.items():
+        if not isinstance(sizes, dict):
+            continue
+        for size, quantity in sizes.items():
+            try:
+                key = (int(product_id), str(size))
+                quantity = int(quantity)
+            except (TypeError, ValueError):
+                continue
+            if quantity > 0:
+                quantities[key] = quantity
+    return quantities
+
+
+def get_cart_choice_data(user, session_cart):
+    '''
+    Price the database cart, the session cart and their merge, for the
+    cart choice page.
+
+    The variants of both carts are read in one query, so the three
+    totals cost two queries whatever the size of the carts. Items whose
+    variant no longer exists are left out, as they are when merging.
+
+    Args:
+        user: The authenticated user.
+        session_cart (dict): Quantities by size, by product ID.
+
+    Returns:
+        dict: The 'database_cart' and 'session_cart', each with its
+        'items' and 'total', and the 'merge_total'.
+    '''
+    session_quantities = parse_session_cart(session_cart)
+    database_quantities = dict(
+        ((product_id, size), quantity)
+        for product_id, size, quantity in CartEntry.objects.filter(
+            user=user, quantity__gt=0
+        ).values_list('product_id', 'size', 'quantity')
+    )
+
+    product_ids = {
+        product_id
+        for product_id, _ in (*session_quantities, *database_quantities)
+    }
+    variants = {
+        (variant.product_id, variant.size): variant
+        for variant in ProductVariant.objects.filter(
+            product_id__in=product_ids
+        ).select_related('product')
+    }
+
+    def price(quantities):
+        items = []
+        total = 0
+        for key, quantity in quantities.items():
+            variant = variants.get(key)
+            if variant is None:
+                continue
+            subtotal = variant.price * quantity
+            items.append({
+                'product': variant.product,
+                'size': variant.size,
+                'quantity': quantity,
+                'price': variant.price,
+                'subtotal': subtotal,
+            })
+            total += subtotal
+        return items, total
+
+    database_items, database_total = price(database_quantities)
+    session_items, session_total = price(session_quantities)
+
+    return {
+        'database_cart': {'items': database_items, 'total': database_total},
+        'session_cart': {'items': session_items, 'total': session_total},
+        'merge_total': database_total + session_total,
+    }
+
+
+def merge_cart_entries(user, session_cart, replace=False):
+    '''
+    Write the items of a session cart to a user's database cart.
+
+    All items are checked against their variants with one query, which
+    also reads the quantities already in the database cart, and written
+    with one upsert, whatever the size of the cart. Items whose variant
+    no longer exists are dropped.
+
+    Args:
+        user: The authenticated user.
+        session_cart (dict): Quantities by size, by product ID.
+        replace (bool): Empty the database cart first instead of adding
+            the session quantities to it.
+
+    Returns:
+        int: The number of cart entries written.
+    '''
+    wanted = parse_session_cart(session_cart)
+
+    with transaction.atomic():
+        if replace:
+            CartEntry.objects.filter(user=user).delete()
+        if not wanted:
+            return 0
+
+        variants = ProductVariant.objects.filter(
+            product_id__in={product_id for product_id, _ in wanted}
+        )
+        if not replace:
+            variants = variants.annotate(
+                in_cart=Subquery(
+                    CartEntry.objects.filter(
+                        user=user,
+                        product_id=OuterRef('product_id'),
+                        size=OuterRef('size')
+                    ).values('quantity')[:1]
+                )
+            )
+
+        entries = []
+        for variant in variants.values():
+            quantity = wanted.get((variant['product_id'], variant['size']))
+            if quantity is None:
+                continue
+            entries.append(CartEntry(
+                user=user,
+                product_id=variant['product_id'],
+                size=variant['size'],
+                quantity=quantity + (variant.get('in_cart') or 0)
+            ))
+
+        CartEntry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['user', 'product', 'size'],
+            update_fields=['quantity', 'updated_at']
+        )
+    return len(entries)
+
+
 def merge_session_cart_to_user(request, user):
     '''
     Merge the session cart with the database cart for a logged-in user.
@@ -21,18 +176,7 @@ def merge_session_cart_to_user(request, user):
     session_cart = request.session.get('cart', {})
 
     if session_cart:
-        for product_id, sizes in session_cart.items():
-            for size, quantity in sizes.items():
-                product = Product.objects.get(pk=product_id)
-                cart_entry, created = CartEntry.objects.get_or_create(
-                    user=user,
-                    product=product,
-                    size=size,
-                    defaults={'quantity': quantity}
-                )
-                if not created:
-                    cart_entry.quantity += quantity
-                    cart_entry.save()
+        merge_cart_entries(user, session_cart)
         del request.session['cart']
         request.session.modified = True
 
@@ -140,9 +284,59 @@ def get_cart_data(request):
     return cart_items, total, adjustments
 
 
-def add_to_cart_logic(request, item_id, size, quantity):
+def add_cart_entry_quantity(user, product_id, size, quantity):
+    '''
+    Add a quantity to a user's cart entry in a single statement.
+
+    The entry is inserted, or its quantity increased on conflict with an
+    existing one, only while the result stays within the variant's
+    stock. Concurrent adds cannot lose updates or exceed the stock.
+
+    Args:
+        user: The authenticated user.
+        product_id: The product ID.
+        size (str): The size of the product.
+        quantity (int): The quantity to add.
+
+    Returns:
+        int or None: The new quantity in the cart, or None if the
+        variant does not exist or has too little stock.
+    '''
+    entries = connection.ops.quote_name(CartEntry._meta.db_table)
+    variants = connection.ops.quote_name(ProductVariant._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            INSERT INTO {entries}
+                (user_id, product_id, size, quantity, created_at, updated_at)
+            SELECT %s, product_id, size, %s, %s, %s
+            FROM {variants}
+            WHERE product_id = %s AND size = %s AND stock >= %s
+            ON CONFLICT (user_id, product_id, size) DO UPDATE
+            SET quantity = {entries}.quantity + EXCLUDED.quantity,
+                updated_at = EXCLUDED.updated_at
+            WHERE {entries}.quantity + EXCLUDED.quantity <= (
+                SELECT stock FROM {variants}
+                WHERE product_id = EXCLUDED.product_id
+                AND size = EXCLUDED.size
+            )
+            RETURNING quantity
+            ''',
+            [
+                user.pk, quantity, now, now,
+                product_id, size, quantity
+            ]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+async def add_to_cart_logic(request, item_id, size, quantity):
     '''
-    Logic for adding items to the cart.
+    Logic for adding items to the cart, using the async ORM and session
+    APIs so ASGI workers are not blocked while waiting on the database.
 
     Args:
         request: The current request object.
@@ -153,9 +347,9 @@ def add_to_cart_logic(request, item_id, size, quantity):
     Returns:
         JsonResponse: The response indicating success or failure.
     '''
-    product_variant = ProductVariant.objects.filter(
+    product_variant = await ProductVariant.objects.filter(
         product_id=item_id, size=size
-    ).first()
+    ).afirst()
 
     if not product_variant:
         return JsonResponse(
@@ -179,45 +373,38 @@ def add_to_cart_logic(request, item_id, size, quantity):
             status=400
         )
 
-    cart = request.session.get('cart', {})
-
-    if not isinstance(cart, dict):
-        cart = {}
+    user = await request.auser()
+    if user.is_authenticated:
+        # The database cart is the only cart of logged in users
+        new_quantity = await sync_to_async(add_cart_entry_quantity)(
+            user, product_variant.product_id, size, quantity
+        )
+        if new_quantity is None:
+            return JsonResponse(
+                {
+                    'success': False,
+                    'type': 'error',
+                    'error': f'Adding {quantity} exceeds available stock'
+                             f' of {stock}.'
+                },
+                status=400
+            )
+    else:
+        cart = await request.session.aget('cart', {})
 
-    item_id_str = str(item_id)
+        if not isinstance(cart, dict):
+            cart = {}
 
-    if item_id_str not in cart:
-        cart[item_id_str] = {}
+        item_id_str = str(item_id)
 
-    if size not in cart[item_id_str]:
-        cart[item_id_str][size] = 0
+        if item_id_str not in cart:
+            cart[item_id_str] = {}
 
-    cart[item_id_str][size] += quantity
-    request.session['cart'] = cart
-    request.session.modified = True
+        if size not in cart[item_id_str]:
+            cart[item_id_str][size] = 0
 
-    if request.user.is_authenticated:
-        product = Product.objects.get(pk=item_id)
-        cart_entry, created = CartEntry.objects.get_or_create(
-            user=request.user,
-            product=product,
-            size=size,
-            defaults={'quantity': quantity}
-        )
-        if not created:
-            new_quantity = cart_entry.quantity + quantity
-            if new_quantity > stock:
-                return JsonResponse(
-                    {
-                        'success': False,
-                        'type': 'error',
-                        'error': f'Adding {quantity} exceeds available stock'
-                                 f' of {stock}.'
-                    },
-                    status=400
-                )
-            cart_entry.quantity = new_quantity
-            cart_entry.save()
+        cart[item_id_str][size] += quantity
+        await request.session.aset('cart', cart)
 
     return JsonResponse(
         {
@@ -227,9 +414,10 @@ def add_to_cart_logic(request, item_id, size, quantity):
         })
 
 
-def update_cart_logic(request, item_id, size, quantity):
+async def update_cart_logic(request, item_id, size, quantity):
     '''
-    Logic for updating items in the cart.
+    Logic for updating items in the cart, using the async ORM and session
+    APIs.
 
     Args:
         request: The current request object.
@@ -240,9 +428,9 @@ def update_cart_logic(request, item_id, size, quantity):
     Returns:
         JsonResponse: The response indicating success or failure.
     '''
-    product_variant = ProductVariant.objects.filter(
+    product_variant = await ProductVariant.objects.filter(
         product_id=item_id, size=size
-    ).first()
+    ).afirst()
 
     if not product_variant:
         return JsonResponse(
@@ -266,17 +454,18 @@ def update_cart_logic(request, item_id, size, quantity):
             status=400
         )
 
-    if request.user.is_authenticated:
-        cart_entry = CartEntry.objects.filter(
-            user=request.user, product_id=item_id, size=size
-        ).first()
+    user = await request.auser()
+    if user.is_authenticated:
+        cart_entry = await CartEntry.objects.filter(
+            user=user, product_id=item_id, size=size
+        ).afirst()
 
         if cart_entry:
             if quantity == 0:
-                cart_entry.delete()
+                await cart_entry.adelete()
             else:
                 cart_entry.quantity = quantity
-                cart_entry.save()
+                await cart_entry.asave()
             return JsonResponse(
                 {
                     'success': True,
@@ -294,7 +483,7 @@ def update_cart_logic(request, item_id, size, quantity):
                 status=404
             )
     else:
-        cart = request.session.get('cart', {})
+        cart = await request.session.aget('cart', {})
         item_id_str = str(item_id)
 
         if item_id_str in cart and size in cart[item_id_str]:
@@ -306,8 +495,7 @@ def update_cart_logic(request, item_id, size, quantity):
             if not cart[item_id_str]:
                 del cart[item_id_str]
 
-            request.session['cart'] = cart
-            request.session.modified = True
+            await request.session.aset('cart', cart)
 
             return JsonResponse(
                 {
@@ -327,9 +515,10 @@ def update_cart_logic(request, item_id, size, quantity):
         )
 
 
-def delete_cart_item_logic(request, item_id, size):
+async def delete_cart_item_logic(request, item_id, size):
     '''
-    Logic for deleting items from the cart.
+    Logic for deleting items from the cart, using the async ORM and
+    session APIs.
 
     Args:
         request: The current request object.
@@ -339,14 +528,14 @@ def delete_cart_item_logic(request, item_id, size):
     Returns:
         JsonResponse: The response indicating success or failure.
     '''
-    if request.user.is_authenticated:
-        product = get_object_or_404(Product, pk=item_id)
-        cart_entry = CartEntry.objects.filter(
-            user=request.user, product=product, size=size
-        ).first()
+    user = await request.auser()
+    if user.is_authenticated:
+        cart_entry = await CartEntry.objects.filter(
+            user=user, product_id=item_id, size=size
+        ).afirst()
 
         if cart_entry:
-            cart_entry.delete()
+            await cart_entry.adelete()
             return JsonResponse(
                 {
                     'success': True,
@@ -364,7 +553,7 @@ def delete_cart_item_logic(request, item_id, size):
                 status=404
             )
     else:
-        cart = request.session.get('cart', {})
+        cart = await request.session.aget('cart', {})
         item_id_str = str(item_id)
 
         if item_id_str in cart and size in cart[item_id_str]:
@@ -373,8 +562,7 @@ def delete_cart_item_logic(request, item_id, size):
             if not cart[item_id_str]:
                 del cart[item_id_str]
 
-            request.session['cart'] = cart
-            request.session.modified = True
+            await request.session.aset('cart', cart)
 
             return JsonResponse(
                 {
@@ -10,15 +10,15 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.contrib import messages
 
 # Internal imports
-from .models import CartEntry
 from .utils import (
     get_cart_data,
+    get_cart_choice_data,
     add_to_cart_logic,
     update_cart_logic,
     delete_cart_item_logic,
+    merge_cart_entries,
     merge_session_cart_to_user
 )
-from product.models import Product
 
 
 class CartChoiceView(View):
@@ -35,44 +35,13 @@ class CartChoiceView(View):
         Returns:
             HttpResponse: The rendered cart choice page.
         '''
-        session_cart = request.session.get('cart', {})
-        session_cart_items = []
-        session_cart_total = 0
-
-        for product_id, sizes in session_cart.items():
-            for size, quantity in sizes.items():
-                try:
-                    product = Product.objects.get(pk=product_id)
-                    variant = product.variants.get(size=size)
-                    price = variant.price
-                    subtotal = price * quantity
-
-                    session_cart_items.append({
-                        'product': product,
-                        'size': size,
-                        'quantity': quantity,
-                        'price': price,
-                        'subtotal': subtotal,
-                    })
-                    session_cart_total += subtotal
-                except Product.DoesNotExist:
-                    continue
-                except ProductVariant.DoesNotExist:
-                    continue
-
-        database_cart_items, database_cart_total, _ = get_cart_data(request)
-
-        return render(request, 'cart/cart_choice.html', {
-            'database_cart': {
-                'items': database_cart_items,
-                'total': database_cart_total
-            },
-            'session_cart': {
-                'items': session_cart_items,
-                'total': session_cart_total
-            },
-            'merge_total': session_cart_total + database_cart_total,
-        })
+        return render(
+            request,
+            'cart/cart_choice.html',
+            get_cart_choice_data(
+                request.user, request.session.get('cart', {})
+            )
+        )
 
     def post(self, request):
         '''
@@ -99,19 +68,12 @@ class CartChoiceView(View):
                 request.session.modified = True
             messages.success(request, 'Kept only the database cart.')
         elif choice == 'keep_session':
-            CartEntry.objects.filter(user=request.user).delete()
-
-            session_cart = request.session.get('cart', {})
-            for product_id, sizes in session_cart.items():
-                for size, quantity in sizes.items():
-                    product = Product.objects.get(pk=product_id)
-                    CartEntry.objects.create(
-                        user=request.user,
-                        product=product,
-                        size=size,
-                        quantity=quantity
-                    )
-            del request.session['cart']
+            merge_cart_entries(
+                request.user,
+                request.session.get('cart', {}),
+                replace=True
+            )
+            request.session.pop('cart', None)
             request.session.modified = True
             messages.success(request, 'Kept only the session cart.')
 
@@ -153,9 +115,10 @@ class CartView(View):
 
 class AddToCartView(View):
     '''
-    Handles adding items to the cart.
+    Handles adding items to the cart. Async, like the other cart JSON
+    views, so ASGI workers serve many cart updates concurrently.
     '''
-    def post(self, request, item_id):
+    async def post(self, request, item_id):
         '''
         Add an item to the cart based on user input.
 
@@ -181,7 +144,7 @@ class AddToCartView(View):
                     status=400
                 )
 
-            return add_to_cart_logic(request, item_id, size, quantity)
+            return await add_to_cart_logic(request, item_id, size, quantity)
 
         except ValueError:
             return JsonResponse(
@@ -207,7 +170,7 @@ class UpdateCartView(View):
     '''
     Handles updating cart items.
     '''
-    def post(self, request, item_id):
+    async def post(self, request, item_id):
         '''
         Update an item's details in the cart.
 
@@ -233,7 +196,7 @@ class UpdateCartView(View):
                     status=400
                 )
 
-            return update_cart_logic(request, item_id, size, quantity)
+            return await update_cart_logic(request, item_id, size, quantity)
 
         except ValueError:
             return JsonResponse(
@@ -259,7 +222,7 @@ class DeleteCartView(View):
     '''
     Handles deleting items from the cart.
     '''
-    def post(self, request, item_id):
+    async def post(self, request, item_id):
         '''
         Remove an item from the cart.
 
@@ -284,7 +247,7 @@ class DeleteCartView(View):
                     status=400
                 )
 
-            return delete_cart_item_logic(request, item_id, size)
+            return await delete_cart_item_logic(request, item_id, size)
 
         except json.JSONDecodeError:
             return JsonResponse(
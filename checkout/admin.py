@@ -1,12 +1,21 @@
+import datetime
+
 # Django imports
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q, Sum
+from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.contrib.admin import TabularInline, ModelAdmin
 
 # Internal imports
 from product.models import Product
-from .models import OrderLineItem, Order
+from .models import DailySales, OrderLineItem, Order
 
 
 class OrderLineItemAdminInline(TabularInline):
@@ -148,13 +157,82 @@ class OrderInline(TabularInline):
         return request.user.is_superuser
 
 
+class EstimatedCountPaginator(Paginator):
+    '''
+    Paginator using the planner's row estimate for unfiltered PostgreSQL
+    tables, as an exact COUNT(*) reads the whole table.
+
+    Filtered lists, small tables and other databases use an exact count.
+    '''
+    # Below this many rows exact counts are cheap enough
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        '''
+        Return the total number of objects, estimated for large tables.
+        '''
+        queryset = self.object_list
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.exact_count_limit:
+                return int(row[0])
+        return super().count
+
+
+class OrderTotalFilter(admin.SimpleListFilter):
+    '''
+    Filter orders by ranges of their total, without querying the
+    existing totals to build the choices.
+    '''
+    title = 'order total'
+    parameter_name = 'total'
+    ranges = {
+        'lt25': (None, 25),
+        '25to50': (25, 50),
+        '50to100': (50, 100),
+        'gte100': (100, None),
+    }
+
+    def lookups(self, request, model_admin):
+        '''
+        Return the available ranges.
+        '''
+        return (
+            ('lt25', 'Under $25'),
+            ('25to50', '$25 to $50'),
+            ('50to100', '$50 to $100'),
+            ('gte100', '$100 and over'),
+        )
+
+    def queryset(self, request, queryset):
+        '''
+        Filter the orders by the selected range.
+        '''
+        if self.value() not in self.ranges:
+            return queryset
+        low, high = self.ranges[self.value()]
+        if low is not None:
+            queryset = queryset.filter(order_total__gte=low)
+        if high is not None:
+            queryset = queryset.filter(order_total__lt=high)
+        return queryset
+
+
 @admin.register(Order)
 class OrderAdmin(ModelAdmin):
     '''
     Admin class for managing Order objects in the admin panel.
 
     Provides detailed views, search functionality, and filters
-    for Order objects.
+    for Order objects. The changelist is built to stay fast on large
+    order tables: filters need no query to render, search only uses
+    indexed lookups, and the total is estimated when unfiltered.
     '''
     model = Order
     inlines = (OrderLineItemAdminInline,)
@@ -194,23 +272,56 @@ class OrderAdmin(ModelAdmin):
     )
 
     list_filter = (
-        'order_number',
-        'user',
         'status',
         'date',
-        'order_total'
+        OrderTotalFilter
     )
 
+    list_select_related = ('user',)
+
     search_fields = (
         'order_number',
-        'user',
-        'date',
-        'order_total',
-        'stripe_pid'
+        'stripe_pid',
+        'email'
+    )
+
+    search_help_text = (
+        'Start of an order number or Stripe payment ID, or a full email '
+        'address.'
     )
 
     ordering = ('-date',)
 
+    paginator = EstimatedCountPaginator
+
+    show_full_result_count = False
+
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_search_results(self, request, queryset, search_term):
+        '''
+        Search orders with lookups served by indexes: a prefix match on
+        the order number or Stripe payment ID, or the exact email.
+
+        Args:
+            request: The HTTP request object.
+            queryset: The orders to search.
+            search_term (str): The text typed in the search box.
+
+        Returns:
+            tuple: The matching orders and False, as the lookups cannot
+            return duplicates.
+        '''
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        return queryset.filter(
+            Q(order_number__startswith=search_term.upper()) |
+            Q(stripe_pid__startswith=search_term) |
+            Q(email__iexact=search_term)
+        ), False
+
     def payment_intent_link(self, obj):
         '''
         Returns a clickable link to the Stripe dashboard.
@@ -284,3 +395,113 @@ class OrderAdmin(ModelAdmin):
             bool: True if the user is a superuser, False otherwise.
         '''
         return request.user.is_superuser
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(ModelAdmin):
+    '''
+    Sales dashboard for staff, in place of the daily sales changelist.
+
+    Figures are only read from the daily sales rollups, which are kept
+    up to date as orders are paid, so the dashboard never aggregates
+    order line items.
+    '''
+    periods = (7, 30, 90, 365)
+    default_period = 30
+
+    def changelist_view(self, request, extra_context=None):
+        '''
+        Render the sales of the selected period: totals, sales per day,
+        best-selling product sizes and sales per category.
+
+        Args:
+            request: The HTTP request object.
+            extra_context (dict): Extra template context.
+
+        Returns:
+            TemplateResponse: The rendered dashboard.
+        '''
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        try:
+            days = int(request.GET.get('days', self.default_period))
+        except ValueError:
+            days = self.default_period
+        if days not in self.periods:
+            days = self.default_period
+
+        end = timezone.localdate()
+        start = end - datetime.timedelta(days=days - 1)
+        sales = DailySales.objects.filter(date__gte=start, date__lte=end)
+        figures = {'revenue': Sum('revenue'), 'units': Sum('units')}
+
+        return TemplateResponse(
+            request,
+            'admin/checkout/dailysales/dashboard.html',
+            {
+                **self.admin_site.each_context(request),
+                'title': 'Sales dashboard',
+                'opts': self.model._meta,
+                'periods': self.periods,
+                'days': days,
+                'start': start,
+                'end': end,
+                'totals': sales.aggregate(**figures),
+                'by_day': sales.values('date').annotate(
+                    **figures
+                ).order_by('-date'),
+                'top_products': sales.values(
+                    'product__name', 'size'
+                ).annotate(
+                    **figures, orders=Sum('orders')
+                ).order_by('-revenue')[:10],
+                'by_category': sales.values('category__name').annotate(
+                    **figures
+                ).order_by('-revenue'),
+                **(extra_context or {}),
+            }
+        )
+
+    def has_module_permission(self, request):
+        '''
+        Checks if the user has permission to view the sales module.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            bool: True if the user is staff or superuser, False otherwise.
+        '''
+        return request.user.is_staff or request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        '''
+        Checks if the user has permission to view the sales dashboard.
+
+        Args:
+            request: The HTTP request object.
+            obj: The current object being viewed (optional).
+
+        Returns:
+            bool: True if the user is staff or superuser, False otherwise.
+        '''
+        return request.user.is_staff or request.user.is_superuser
+
+    def has_add_permission(self, request):
+        '''
+        Rollups are only written by checkout.sales.
+        '''
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        '''
+        Rollups are only written by checkout.sales.
+        '''
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        '''
+        Rollups are only written by checkout.sales.
+        '''
+        return False
@@ -0,0 +1,78 @@
+import datetime
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+# Internal imports
+from checkout.models import Order
+from checkout.sales import rebuild_daily_sales
+
+
+class Command(BaseCommand):
+    '''
+    Backfill the daily sales rollups from the orders, a chunk of days at
+    a time so each transaction stays short.
+
+    Orders paid while a chunk is rebuilt may be missed or counted twice,
+    so run it when few orders are being placed or changed.
+    '''
+    help = 'Rebuild the daily sales rollups from historical orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=datetime.date.fromisoformat,
+            help='First day to rebuild (YYYY-MM-DD), the first order by '
+                 'default.'
+        )
+        parser.add_argument(
+            '--end',
+            type=datetime.date.fromisoformat,
+            help='Last day to rebuild (YYYY-MM-DD), the last order by '
+                 'default.'
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=7,
+            help='Days rebuilt per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days must be at least 1.')
+
+        start, end = options['start'], options['end']
+        if start is None or end is None:
+            bounds = Order.objects.aggregate(
+                first=Min('date'), last=Max('date')
+            )
+            if bounds['first'] is None:
+                self.stdout.write('No orders to process.')
+                return
+            start = start or timezone.localdate(bounds['first'])
+            end = end or timezone.localdate(bounds['last'])
+        if end < start:
+            raise CommandError('--end must not be before --start.')
+
+        chunk = datetime.timedelta(days=options['chunk_days'])
+        last = end + datetime.timedelta(days=1)
+        day = start
+        rows = 0
+        while day < last:
+            chunk_end = min(day + chunk, last)
+            written = rebuild_daily_sales(day, chunk_end)
+            rows += written
+            self.stdout.write(
+                f'{day} to {chunk_end - datetime.timedelta(days=1)}: '
+                f'{written} row(s)'
+            )
+            day = chunk_end
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt daily sales from {start} to {end}: {rows} row(s).'
+            )
+        )
@@ -0,0 +1,29 @@
+import time
+
+# Django imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Internal imports
+from checkout.sales import refresh_best_sellers
+
+
+class Command(BaseCommand):
+    '''
+    Recompute the best-seller scores used by the best-selling sort and
+    the home page top sellers from the daily sales rollups, dropping the
+    days that left the window. Meant to run daily, shortly after
+    midnight, from a scheduler.
+    '''
+    help = 'Refresh the rolling best-seller scores of the products.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        changed = refresh_best_sellers()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Updated {changed} product score(s) over the last '
+                f'{settings.BEST_SELLER_DAYS} day(s) in '
+                f'{time.perf_counter() - started:.1f}s.'
+            )
+        )
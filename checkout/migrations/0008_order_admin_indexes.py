@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-19 19:11
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0007_alter_order_country'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_number',
+            field=models.CharField(db_index=True, editable=False, max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='stripe_pid',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='order_email_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.3 on 2026-10-19 19:18
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_summary(apps, schema_editor):
+    '''
+    Populate the line item summary of the existing orders.
+    '''
+    Order = apps.get_model('checkout', 'Order')
+    OrderLineItem = apps.get_model('checkout', 'OrderLineItem')
+    items = OrderLineItem.objects.filter(order=OuterRef('pk'))
+    Order.objects.update(
+        item_count=Coalesce(
+            Subquery(
+                items.values('order').annotate(
+                    total=Sum('quantity')
+                ).values('total')
+            ),
+            0
+        ),
+        first_image_url=Coalesce(
+            Subquery(
+                items.order_by('id').values(
+                    url=KeyTextTransform('list', 'product__image_urls')
+                )[:1]
+            ),
+            Value('')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0008_order_admin_indexes'),
+        ('product', '0010_product_image_urls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='first_image_url',
+            field=models.CharField(blank=True, default='', editable=False, help_text='List image URL of the first product ordered.', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of items ordered.'),
+        ),
+        migrations.RunPython(
+            backfill_order_summary, migrations.RunPython.noop
+        ),
+    ]
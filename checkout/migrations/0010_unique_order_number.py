@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0009_order_summary_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_number',
+            field=models.CharField(editable=False, max_length=32, unique=True),
+        ),
+    ]
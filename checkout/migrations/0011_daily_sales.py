@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-19 19:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0010_unique_order_number'),
+        ('product', '0011_product_image_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='sales_recorded',
+            field=models.BooleanField(default=False, editable=False, help_text='Whether the order is counted in the daily sales.'),
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('size', models.CharField(max_length=10)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('units', models.IntegerField(default=0)),
+                ('orders', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales', to='product.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='product.product')),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+                'constraints': [models.UniqueConstraint(fields=('date', 'product', 'size'), name='daily_sales_unique')],
+            },
+        ),
+    ]
@@ -1,14 +1,70 @@
-import uuid
+import secrets
+import time
 
 # Django imports
 from django.db import models
 from django.db.models import Sum
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django_countries.fields import CountryField
 
 # Internal imports
-from product.models import Product
+from product.models import Category, Product
+
+# Crockford's base32 alphabet, without I, L, O and U
+ORDER_NUMBER_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ORDER_NUMBER_LENGTH = 20
+
+# Characters read as digits in order numbers, as they are easy to confuse
+ORDER_NUMBER_ALIASES = str.maketrans('ILO', '110')
+
+
+def generate_order_number(timestamp=None):
+    '''
+    Generate a compact, time-ordered order number.
+
+    The first 10 characters encode the creation time in milliseconds and
+    the last 10 are random, so numbers sort by creation time and new
+    orders are added at the end of the order number index rather than
+    at random places in it.
+
+    Args:
+        timestamp (float): The creation time in seconds since the epoch,
+            defaulting to now.
+
+    Returns:
+        str: A 20 character base32 order number.
+    '''
+    if timestamp is None:
+        timestamp = time.time()
+    value = (int(timestamp * 1000) << 50) | secrets.randbits(50)
+
+    characters = []
+    for _ in range(ORDER_NUMBER_LENGTH):
+        characters.append(ORDER_NUMBER_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(characters))
+
+
+def normalize_order_number(order_number):
+    '''
+    Normalize an order number typed or linked by a customer.
+
+    Order numbers are stored in upper case, in the current format or as
+    the 32 character hexadecimal numbers of older orders, which are still
+    found as they are.
+
+    Args:
+        order_number (str): The order number to normalize.
+
+    Returns:
+        str: The order number as stored.
+    '''
+    order_number = order_number.strip().upper()
+    if len(order_number) == ORDER_NUMBER_LENGTH:
+        order_number = order_number.translate(ORDER_NUMBER_ALIASES)
+    return order_number
 
 
 class Order(models.Model):
@@ -31,6 +87,11 @@ class Order(models.Model):
         date (DateTimeField): Timestamp of the order creation.
         order_total (DecimalField): Total cost of the order.
         stripe_pid (CharField): Stripe Payment Intent ID.
+        item_count (PositiveIntegerField): Number of items ordered.
+        first_image_url (CharField): List image URL of the first product
+            ordered, for the order history.
+        sales_recorded (BooleanField): Whether the order is counted in the
+            daily sales rollups.
     '''
     STATUS_CHOICES = [
         ('cancelled', 'Cancelled'),
@@ -44,8 +105,9 @@ class Order(models.Model):
         related_name='orders', blank=True, null=True
     )
 
+    # 32 characters for the hexadecimal numbers of older orders
     order_number = models.CharField(
-        max_length=32, null=False, editable=False
+        max_length=32, null=False, editable=False, unique=True
     )
 
     status = models.CharField(
@@ -62,40 +124,86 @@ class Order(models.Model):
     street_address1 = models.CharField(max_length=80, null=False, blank=False)
     street_address2 = models.CharField(max_length=80, null=True, blank=True)
     county = models.CharField(max_length=80, null=True, blank=True)
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(auto_now_add=True, db_index=True)
     order_total = models.DecimalField(
         max_digits=10, decimal_places=2, null=False, default=0
     )
-    stripe_pid = models.CharField(max_length=255, null=True, blank=True)
+    stripe_pid = models.CharField(
+        max_length=255, null=True, blank=True, db_index=True
+    )
+
+    # Summary of the line items, kept up to date by update_total()
+    item_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text='Number of items ordered.'
+    )
+    first_image_url = models.CharField(
+        max_length=500, blank=True, default='', editable=False,
+        help_text='List image URL of the first product ordered.'
+    )
+
+    # Set while the order is counted in DailySales, see checkout.sales
+    sales_recorded = models.BooleanField(
+        default=False, editable=False,
+        help_text='Whether the order is counted in the daily sales.'
+    )
+
+    class Meta:
+        indexes = [
+            # Case-insensitive email lookups from the admin search
+            models.Index(Upper('email'), name='order_email_upper_idx'),
+        ]
 
     def _generate_order_number(self):
         '''
-        Generate a random, unique order number using UUID.
+        Generate a unique, time-ordered order number.
 
         Returns:
             str: A unique order number.
         '''
-        return uuid.uuid4().hex.upper()
+        return generate_order_number()
 
     def update_total(self):
         '''
-        Update the order's total by aggregating line item totals.
+        Update the order's total and line item summary by aggregating
+        its line items.
 
-        If no line items remain, sets the order total to 0.
+        If no line items remain, sets the order total and item count
+        to 0.
         '''
-        total = self.lineitems.aggregate(Sum('lineitem_total'))[
-            'lineitem_total__sum'
-        ]
-        self.order_total = total if total is not None else 0
+        totals = self.lineitems.aggregate(
+            total=Sum('lineitem_total'), items=Sum('quantity')
+        )
+        self.order_total = (
+            totals['total'] if totals['total'] is not None else 0
+        )
+        self.item_count = totals['items'] or 0
+
+        first_item = self.lineitems.select_related(
+            'product'
+        ).order_by('id').first()
+        self.first_image_url = (
+            first_item.product.image_url('list') if first_item else ''
+        )
         self.save()
 
     def save(self, *args, **kwargs):
         '''
         Override the save method to generate an order number
         if not already set.
+
+        Saving an existing order leaves sales_recorded as it is in the
+        database, as only checkout.sales may change it.
         '''
         if not self.order_number:
             self.order_number = self._generate_order_number()
+        if not self._state.adding and not args and (
+            kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'sales_recorded'
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -151,3 +259,46 @@ class OrderLineItem(models.Model):
             f'Product ID {self.product.id} on order '
             f'{self.order.order_number}'
         )
+
+
+class DailySales(models.Model):
+    '''
+    Model representing the sales of one product size on one day, for
+    reporting.
+
+    Rows are maintained by checkout.sales as orders become paid, so
+    reports never aggregate order line items.
+
+    Attributes:
+        date (DateField): The day the orders were placed.
+        product (ForeignKey): The product sold.
+        size (CharField): The size of the product variant.
+        category (ForeignKey): The product's category when sold.
+        revenue (DecimalField): Total of the line items.
+        units (IntegerField): Quantity sold.
+        orders (IntegerField): Number of orders including the product size.
+    '''
+    date = models.DateField()
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='daily_sales'
+    )
+    size = models.CharField(max_length=10)
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='daily_sales'
+    )
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    units = models.IntegerField(default=0)
+    orders = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'product', 'size'],
+                name='daily_sales_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id} ({self.size}) on {self.date}'
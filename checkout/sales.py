@@ -0,0 +1,250 @@
+import datetime
+
+# Django imports
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+# Internal imports
+from product.models import Product
+from .models import DailySales, Order, OrderLineItem
+
+# Order statuses counted as sales
+SALES_STATUSES = ('paid', 'shipped')
+
+
+def _start_of_day(day):
+    '''
+    Return the aware datetime starting a day in the current timezone.
+    '''
+    return datetime.datetime.combine(
+        day, datetime.time.min, tzinfo=timezone.get_current_timezone()
+    )
+
+
+def best_seller_start(days=None):
+    '''
+    Return the first day counted by the best-seller scores.
+
+    Args:
+        days (int): Length of the window, BEST_SELLER_DAYS by default.
+
+    Returns:
+        date: The first day of the window, today being the last one.
+    '''
+    days = days or settings.BEST_SELLER_DAYS
+    return timezone.localdate() - datetime.timedelta(days=days - 1)
+
+
+def adjust_units_sold(units):
+    '''
+    Atomically add sold units to the best-seller scores of products.
+
+    Args:
+        units (dict): Units to add, negative to remove, by product id.
+    '''
+    units = {pk: delta for pk, delta in units.items() if delta}
+    if not units:
+        return
+    Product.objects.filter(pk__in=units).update(
+        units_sold=Greatest(
+            F('units_sold') + Case(
+                *(When(pk=pk, then=Value(delta))
+                  for pk, delta in units.items()),
+                default=Value(0)
+            ),
+            Value(0)
+        )
+    )
+
+
+def refresh_best_sellers(products=None, days=None):
+    '''
+    Recompute the best-seller scores from the daily sales of the window.
+
+    Orders keep the scores current as they are paid, but the days
+    leaving the window are only dropped here, so run it daily. Only
+    the rollups are read, never the order line items.
+
+    Args:
+        products (iterable): Ids of the products to refresh, all of
+            them by default.
+        days (int): Length of the window, BEST_SELLER_DAYS by default.
+
+    Returns:
+        int: The number of products whose score changed.
+    '''
+    score = Coalesce(
+        Subquery(
+            DailySales.objects.filter(
+                product=OuterRef('pk'), date__gte=best_seller_start(days)
+            ).values('product').annotate(
+                total=Sum('units')
+            ).values('total')
+        ),
+        Value(0)
+    )
+    queryset = Product.objects.all()
+    if products is not None:
+        queryset = queryset.filter(pk__in=list(products))
+    return queryset.annotate(score=score).filter(
+        ~Q(units_sold=F('score'))
+    ).update(units_sold=F('score'))
+
+
+def record_order_sales(order, sign=1):
+    '''
+    Add an order's line items to the daily sales of the day it was
+    placed, or remove them.
+
+    The line items are grouped in one query and written with one upsert
+    per product size, adding to the existing counters so concurrent
+    orders cannot lose updates. Orders placed within the best-seller
+    window also update the scores of their products.
+
+    Args:
+        order (Order): The order to count.
+        sign (int): 1 to add the order, -1 to remove it.
+    '''
+    items = list(order.lineitems.values(
+        'product', 'size', 'product__category'
+    ).annotate(
+        revenue=Sum('lineitem_total'), units=Sum('quantity')
+    ).order_by())
+
+    ops = connection.ops
+    order_day = timezone.localdate(order.date)
+    day = ops.adapt_datefield_value(order_day)
+    rows = [
+        (
+            day, item['product'], item['size'], item['product__category'],
+            ops.adapt_decimalfield_value(sign * item['revenue'], 12, 2),
+            sign * item['units'],
+            sign,
+        )
+        for item in items
+    ]
+    if not rows:
+        return
+
+    table = ops.quote_name(DailySales._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'''
+            INSERT INTO {table}
+                (date, product_id, size, category_id, revenue, units, orders)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (date, product_id, size) DO UPDATE
+            SET revenue = {table}.revenue + EXCLUDED.revenue,
+                units = {table}.units + EXCLUDED.units,
+                orders = {table}.orders + EXCLUDED.orders
+            ''',
+            rows
+        )
+
+    if order_day >= best_seller_start():
+        units = {}
+        for item in items:
+            units[item['product']] = (
+                units.get(item['product'], 0) + sign * item['units']
+            )
+        adjust_units_sold(units)
+
+
+def sync_order_sales(order):
+    '''
+    Count an order in the daily sales when its status becomes a sales
+    status, or stop counting it when it leaves them.
+
+    The order's sales_recorded flag is switched with a conditional
+    update, so an order is counted once even if saved concurrently.
+
+    Args:
+        order (Order): The saved order.
+
+    Returns:
+        bool: Whether the daily sales changed.
+    '''
+    counted = order.status in SALES_STATUSES
+    with transaction.atomic():
+        changed = Order.objects.filter(
+            pk=order.pk, sales_recorded=not counted
+        ).update(sales_recorded=counted)
+        if changed:
+            record_order_sales(order, 1 if counted else -1)
+    order.sales_recorded = counted
+    return bool(changed)
+
+
+def rebuild_daily_sales(start, end):
+    '''
+    Recompute the daily sales of a range of days from their orders, and
+    mark which of those orders are counted.
+
+    Used by the rebuild_daily_sales command to backfill the rollups, and
+    when the line items of a counted order change. The best-seller
+    scores of the products sold on those days are refreshed when the
+    range overlaps the window.
+
+    Args:
+        start (date): The first day to rebuild.
+        end (date): The day after the last day to rebuild.
+
+    Returns:
+        int: The number of daily sales rows written.
+    '''
+    lower, upper = _start_of_day(start), _start_of_day(end)
+    orders = Order.objects.filter(date__gte=lower, date__lt=upper)
+    items = OrderLineItem.objects.filter(
+        order__date__gte=lower,
+        order__date__lt=upper,
+        order__status__in=SALES_STATUSES
+    ).annotate(
+        day=TruncDate('order__date')
+    ).values(
+        'day', 'product', 'size', 'product__category'
+    ).annotate(
+        revenue=Sum('lineitem_total'),
+        units=Sum('quantity'),
+        order_count=Count('order', distinct=True)
+    ).order_by()
+
+    with transaction.atomic():
+        previous = DailySales.objects.filter(date__gte=start, date__lt=end)
+        products = set(previous.values_list('product', flat=True))
+        previous.delete()
+        rows = DailySales.objects.bulk_create(
+            [
+                DailySales(
+                    date=item['day'],
+                    product_id=item['product'],
+                    size=item['size'],
+                    category_id=item['product__category'],
+                    revenue=item['revenue'],
+                    units=item['units'],
+                    orders=item['order_count'],
+                )
+                for item in items
+            ],
+            batch_size=1000
+        )
+        orders.update(sales_recorded=Case(
+            When(status__in=SALES_STATUSES, then=Value(True)),
+            default=Value(False)
+        ))
+        if end > best_seller_start():
+            products.update(row.product_id for row in rows)
+            refresh_best_sellers(products)
+    return len(rows)
@@ -1,15 +1,32 @@
+import datetime
+
 # Django imports
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
 # Internal imports
-from .models import OrderLineItem
+from .models import Order, OrderLineItem
+from .sales import (
+    SALES_STATUSES,
+    rebuild_daily_sales,
+    sync_order_sales
+)
+
+
+def _rebuild_order_day(order):
+    '''
+    Recompute the daily sales of the day an order was placed.
+    '''
+    day = timezone.localdate(order.date)
+    rebuild_daily_sales(day, day + datetime.timedelta(days=1))
 
 
 @receiver(post_save, sender=OrderLineItem)
 def update_on_save(sender, instance, created, **kwargs):
     '''
-    Signal to update the order total when an order line item is saved.
+    Signal to update the order total when an order line item is saved,
+    and the daily sales if the order is counted in them.
 
     Args:
         sender: The model class that sent the signal.
@@ -18,12 +35,15 @@ def update_on_save(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments.
     '''
     instance.order.update_total()
+    if instance.order.sales_recorded:
+        _rebuild_order_day(instance.order)
 
 
 @receiver(post_delete, sender=OrderLineItem)
 def update_on_delete(sender, instance, **kwargs):
     '''
-    Signal to update the order total when an order line item is deleted.
+    Signal to update the order total when an order line item is deleted,
+    and the daily sales if the order is counted in them.
 
     Args:
         sender: The model class that sent the signal.
@@ -31,3 +51,34 @@ def update_on_delete(sender, instance, **kwargs):
         **kwargs: Additional keyword arguments.
     '''
     instance.order.update_total()
+    if instance.order.sales_recorded:
+        _rebuild_order_day(instance.order)
+
+
+@receiver(post_save, sender=Order)
+def update_sales_on_save(sender, instance, **kwargs):
+    '''
+    Signal to count an order in the daily sales when it is paid, or to
+    stop counting it when its status changes back.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved.
+        **kwargs: Additional keyword arguments.
+    '''
+    if (instance.status in SALES_STATUSES) != instance.sales_recorded:
+        sync_order_sales(instance)
+
+
+@receiver(post_delete, sender=Order)
+def update_sales_on_delete(sender, instance, **kwargs):
+    '''
+    Signal to remove a deleted order from the daily sales.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    if instance.sales_recorded:
+        _rebuild_order_day(instance)
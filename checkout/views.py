@@ -6,8 +6,9 @@ from django import forms
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.shortcuts import redirect, reverse
+from django.template.loader import render_to_string
 from django.utils.html import format_html
 from django.views.generic import ListView, DetailView, View
 from django.views.generic.edit import FormView
@@ -18,7 +19,7 @@ from allauth.account.models import EmailAddress
 
 # Internal imports
 from .forms import OrderForm
-from .models import Order, OrderLineItem
+from .models import Order, OrderLineItem, normalize_order_number
 from product.models import Product
 from cart.utils import get_cart_data
 from accounts.models import UserProfile
@@ -372,20 +373,51 @@ class OrderDetailView(LoginRequiredMixin, DetailView):
         '''
         order_number = self.kwargs.get('order_id')
         try:
-            order = Order.objects.get(order_number=order_number)
-            if order.user != self.request.user:
+            order = Order.objects.prefetch_related('lineitems').get(
+                order_number=normalize_order_number(order_number)
+            )
+            if order.user_id != self.request.user.id:
                 raise Http404('You do not have permission to view this order.')
         except Order.DoesNotExist:
             raise Http404('Order not found.')
         return order
 
 
-class OrderListView(LoginRequiredMixin, ListView):
+class OrderPageMixin:
+    '''
+    Provide paginated access to the order history of a user.
+
+    Pages are fetched with one extra row to detect if more orders exist,
+    so no COUNT query is needed. Rows only use the order's summary
+    fields, so line items are not loaded.
+    '''
+    orders_per_page = 10
+
+    def get_order_page(self, user, page=1):
+        '''
+        Retrieve one page of a user's orders, newest first.
+
+        Args:
+            user: The user whose orders are listed.
+            page (int): The 1-based page number.
+
+        Returns:
+            tuple: The orders on the page and whether more pages exist.
+        '''
+        orders = Order.objects.filter(user=user).order_by('-date', '-id')
+        offset = (page - 1) * self.orders_per_page
+        page_orders = list(orders[offset:offset + self.orders_per_page + 1])
+        has_next = len(page_orders) > self.orders_per_page
+        return page_orders[:self.orders_per_page], has_next
+
+
+class OrderListView(LoginRequiredMixin, OrderPageMixin, ListView):
     '''
-    View to display a list of all orders for the logged-in user.
+    View to display the first page of orders for the logged-in user.
 
     Orders are filtered by the currently logged-in user and ordered
-    by date in descending order.
+    by date in descending order. Further pages are loaded from
+    OrderListPageView while scrolling.
     '''
     model = Order
     template_name = 'checkout/order_list.html'
@@ -393,11 +425,60 @@ class OrderListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         '''
-        Filter the queryset to include only orders for the logged-in user.
+        Retrieve the first page of orders for the logged-in user.
 
         Returns:
-            QuerySet: A queryset of orders belonging to the logged-in user.
+            list: The orders on the first page.
+        '''
+        orders, self.has_more_orders = self.get_order_page(
+            self.request.user
+        )
+        return orders
+
+    def get_context_data(self, **kwargs):
+        '''
+        Add whether more orders can be loaded to the context.
         '''
-        return Order.objects.filter(
-            user=self.request.user
-        ).order_by('-date')
+        context = super().get_context_data(**kwargs)
+        context['has_more_orders'] = self.has_more_orders
+        return context
+
+
+class OrderListPageView(LoginRequiredMixin, OrderPageMixin, View):
+    '''
+    Return a page of the user's orders as rendered HTML for infinite
+    scrolling. Always returns a JSON response.
+    '''
+    def get(self, request):
+        '''
+        Handle GET requests for a page of orders.
+
+        Args:
+            request: The incoming HTTP request.
+
+        Returns:
+            JsonResponse: The rendered orders and pagination details.
+        '''
+        try:
+            page = max(int(request.GET.get('page') or 1), 1)
+        except ValueError:
+            return JsonResponse({
+                'success': False, 'error': 'Invalid page.'
+            }, status=400)
+
+        orders, has_next = self.get_order_page(request.user, page)
+        html = ''.join(
+            render_to_string(
+                'checkout/includes/order_row.html',
+                {'order': order},
+                request=request
+            )
+            for order in orders
+        )
+
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'has_next': has_next,
+            'next_page': page + 1,
+        })
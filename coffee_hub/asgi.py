@@ -3,6 +3,11 @@ ASGI config for coffee_hub project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server instead of the default WSGI one, e.g.
+``gunicorn coffee_hub.asgi:application -k uvicorn.workers.UvicornWorker``
+or ``uvicorn coffee_hub.asgi:application``. The project middleware is
+async-capable, so async views run on the event loop end to end.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 '''
@@ -87,6 +87,9 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    # Opt-in request profiling, first so it times the whole chain
+    'store.middleware.ProfilingMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,8 +98,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
-    # Static file for heroku setup
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Static file for heroku setup (WhiteNoise, async-capable for ASGI)
+    'store.middleware.StaticFilesMiddleware',
 
     # allauth requires:
     'allauth.account.middleware.AccountMiddleware',
@@ -159,6 +162,7 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 WSGI_APPLICATION = 'coffee_hub.wsgi.application'
+ASGI_APPLICATION = 'coffee_hub.asgi.application'
 
 
 # Database
@@ -239,6 +243,41 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': os.environ.get('CLOUDINARY_API_SECRET'),
 }
 
+# Product image backend: 'cloudinary' or 'local'. The local backend builds
+# WebP/AVIF renditions with Pillow at upload time and stores them under
+# PRODUCT_IMAGE_ROOT, which must be persistent storage when used in
+# production. Images keep the backend they were uploaded with.
+PRODUCT_IMAGE_BACKEND = os.environ.get('PRODUCT_IMAGE_BACKEND', 'cloudinary')
+PRODUCT_IMAGE_ROOT = os.environ.get(
+    'PRODUCT_IMAGE_ROOT', os.path.join(BASE_DIR, 'product_images')
+)
+
+# Whole-page cache for anonymous product detail pages, in seconds.
+# Disabled when 0. Use a shared cache backend (CACHES) when running several
+# workers, so purges after product changes reach every process.
+PRODUCT_PAGE_CACHE_TIMEOUT = int(
+    os.environ.get('PRODUCT_PAGE_CACHE_TIMEOUT', 0)
+)
+
+# Seconds each process serves its category list before checking the
+# categories table for changes. Changes made in the same process show at
+# once.
+CATEGORY_REGISTRY_TTL = float(os.environ.get('CATEGORY_REGISTRY_TTL', 10))
+
+# Days of sales counted by the best-selling catalog sort and the home page
+# top sellers. Refresh the scores daily with the refresh_best_sellers
+# command so older days leave the window.
+BEST_SELLER_DAYS = int(os.environ.get('BEST_SELLER_DAYS', 30))
+
+# Request profiling (store.middleware.ProfilingMiddleware). When enabled,
+# staff users get a Server-Timing header on every response, and the share
+# of requests set by the sample rate (plus any request slower than
+# PROFILING_SLOW_MS, when set) is logged as JSON lines to PROFILING_LOG_FILE.
+PROFILING_ENABLED = 'PROFILING_ENABLED' in os.environ
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.01))
+PROFILING_SLOW_MS = float(os.environ.get('PROFILING_SLOW_MS', 0))
+PROFILING_LOG_FILE = os.environ.get('PROFILING_LOG_FILE')
+
 # Cookie policy
 SESSION_COOKIE_SECURE = True  # Ensures session cookies are sent over HTTPS
 CSRF_COOKIE_SECURE = True  # Ensures CSRF cookies are sent over HTTPS
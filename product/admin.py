@@ -1,13 +1,18 @@
 # Django imports
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
 
 # Internal imports
+from .catalog import apply_variant_updates
 from .models import (
     Product,
     ProductVariant,
     Category,
-    ProductReview
+    ProductReview,
+    ProductImageJob
 )
 
 
@@ -89,6 +94,7 @@ class ProductAdmin(admin.ModelAdmin):
         'category',
         'description',
         'rating',
+        'rating_count',
         'image_path',
         'image_preview',
         'active',
@@ -101,9 +107,12 @@ class ProductAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at',
         'image_preview',
-        'rating'
+        'rating',
+        'rating_count'
     )
 
+    actions = ['update_variants']
+
     def image_preview(self, obj):
         '''
         Return an HTML img tag for the product's image.
@@ -128,6 +137,65 @@ class ProductAdmin(admin.ModelAdmin):
         '''
         obj.save()
 
+    @admin.action(description='Update stock and prices of selected products')
+    def update_variants(self, request, queryset):
+        '''
+        Show the variants of the selected products in one form and apply
+        the changed stock and prices as a single batch.
+        '''
+        variants = ProductVariant.objects.filter(
+            product__in=queryset
+        ).select_related('product').order_by('product__name', 'size')
+
+        if 'apply' not in request.POST:
+            return TemplateResponse(
+                request,
+                'admin/product/product/variant_bulk_update.html',
+                {
+                    **self.admin_site.each_context(request),
+                    'title': 'Update stock and prices',
+                    'opts': self.model._meta,
+                    'variants': variants,
+                    'queryset': queryset,
+                    'action_checkbox_name': ACTION_CHECKBOX_NAME,
+                }
+            )
+
+        rows, labels = [], []
+        for variant in variants:
+            row = {'id': variant.id}
+            for field in ('stock', 'price'):
+                value = request.POST.get(f'{field}_{variant.id}', '').strip()
+                if value and value != str(getattr(variant, field)):
+                    row[field] = value
+            if len(row) > 1:
+                rows.append(row)
+                labels.append(str(variant))
+
+        if not rows:
+            self.message_user(request, 'No changes made.', messages.INFO)
+            return None
+
+        try:
+            applied, results = apply_variant_updates(rows)
+        except ValidationError as e:
+            self.message_user(request, e.messages[0], messages.ERROR)
+            return None
+
+        if applied:
+            self.message_user(
+                request, f'{len(results)} size(s) updated.', messages.SUCCESS
+            )
+        else:
+            errors = '; '.join(
+                f"{labels[result['index']]}: {result['error']}"
+                for result in results if not result['success']
+            )
+            self.message_user(
+                request, f'No changes applied. {errors}', messages.ERROR
+            )
+        return None
+
 
 class ProductInline(admin.TabularInline):
     '''
@@ -215,3 +283,61 @@ class ProductReviewAdmin(admin.ModelAdmin):
         Allow deletes only if the user is a superuser.
         '''
         return request.user.is_superuser
+
+
+@admin.register(ProductImageJob)
+class ProductImageJobAdmin(admin.ModelAdmin):
+    '''
+    Admin class for following queued product image uploads.
+
+    Jobs are created by the product views and processed by the
+    process_image_jobs command, so they are read-only here.
+    '''
+    list_display = (
+        'id',
+        'product',
+        'status',
+        'progress',
+        'attempts',
+        'created_by',
+        'created_at',
+        'updated_at'
+    )
+
+    list_filter = (
+        'status',
+        'created_at'
+    )
+
+    search_fields = (
+        'product__name',
+        'file_name'
+    )
+
+    list_select_related = ('product', 'created_by')
+
+    ordering = ('-created_at',)
+
+    readonly_fields = (
+        'product',
+        'file_name',
+        'status',
+        'progress',
+        'error',
+        'attempts',
+        'created_by',
+        'created_at',
+        'updated_at'
+    )
+
+    def get_queryset(self, request):
+        '''
+        Leave the staged file content out of admin queries.
+        '''
+        return super().get_queryset(request).defer('data')
+
+    def has_add_permission(self, request):
+        '''
+        Jobs are only created by image uploads.
+        '''
+        return False
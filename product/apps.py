@@ -6,7 +6,17 @@ class ProductConfig(AppConfig):
     '''
     Configuration class for the 'product' application.
 
-    This class is used to configure settings specific to the product app.
+    This class is used to configure the app's settings and ensure that
+    necessary signals are imported when the app is ready.
     '''
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'product'
+
+    def ready(self):
+        '''
+        Executes initialization logic when the app is ready.
+
+        Imports the signals module to connect signal handlers defined
+        in the 'product' application.
+        '''
+        import product.signals
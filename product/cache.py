@@ -0,0 +1,429 @@
+import hashlib
+import time
+import uuid
+from urllib.parse import quote
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value
+)
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+# Internal imports
+from .models import (
+    Category,
+    Product,
+    ProductVariant,
+    ProductReview,
+    RelatedProduct
+)
+
+# Rendered pages are stored with this value in place of the CSRF token,
+# which is swapped for the visitor's own token when the page is served
+CSRF_PLACEHOLDER = 'product-page-csrf-placeholder'
+
+CATALOG_VERSION_KEY = 'product-page-version:catalog'
+
+# Categories loaded by this process, with the state of the category table
+# they were loaded at and when that state was last checked
+_category_registry = {'state': None, 'checked': None, 'items': ()}
+
+
+def _version_key(slug):
+    '''
+    Return the cache key holding the content version of a product page.
+
+    Args:
+        slug (str): The product slug.
+
+    Returns:
+        str: The cache key.
+    '''
+    return f'product-page-version:{slug}'
+
+
+def _get_version(key):
+    '''
+    Return the version stored under the given key, creating one if the
+    key is missing or was evicted.
+
+    Versions are random tokens rather than counters, so an evicted key
+    can never bring back a previously cached page.
+
+    Args:
+        key (str): The version cache key.
+
+    Returns:
+        str: The current version token.
+    '''
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_page_version(slug):
+    '''
+    Invalidate every cached variant of a product page.
+
+    Args:
+        slug (str): The product slug.
+    '''
+    if slug:
+        cache.set(_version_key(slug), uuid.uuid4().hex, None)
+
+
+def bump_catalog_version():
+    '''
+    Invalidate all cached product pages at once, e.g. after category
+    changes shown on every page.
+    '''
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def bump_category_version():
+    '''
+    Make this process reload its category registry on next use. Other
+    processes notice the change within CATEGORY_REGISTRY_TTL seconds.
+    '''
+    _category_registry['checked'] = None
+
+
+def get_categories():
+    '''
+    Return all categories ordered by slug, from the process-local registry.
+
+    At most every CATEGORY_REGISTRY_TTL seconds, the registry checks the
+    latest update time and number of categories in the database and
+    reloads when they changed, so changes made by other workers or by
+    management commands show without a shared cache. Other requests cost
+    no query.
+
+    Returns:
+        tuple: Dicts with the 'id', 'name' and 'slug' of each category.
+    '''
+    now = time.monotonic()
+    checked = _category_registry['checked']
+    if checked is None or now - checked >= settings.CATEGORY_REGISTRY_TTL:
+        state = Category.objects.aggregate(
+            updated=Max('updated_at'), count=Count('pk')
+        )
+        if checked is None or _category_registry['state'] != state:
+            items = tuple(
+                Category.objects.order_by('slug').values(
+                    'id', 'name', 'slug'
+                )
+            )
+            _category_registry.update(state=state, items=items)
+        _category_registry['checked'] = now
+    return _category_registry['items']
+
+
+def get_category_ids(slugs):
+    '''
+    Return the ids of the categories with the given slugs, ignoring
+    unknown slugs.
+
+    Args:
+        slugs (list): Category slugs.
+
+    Returns:
+        list: The matching category ids.
+    '''
+    slugs = set(slugs)
+    return [
+        category['id'] for category in get_categories()
+        if category['slug'] in slugs
+    ]
+
+
+class AnonymousPageCacheMixin:
+    '''
+    Cache whole rendered pages for anonymous GET requests.
+
+    Opt-in: caching only happens when page_cache_timeout (defaulting to
+    the PRODUCT_PAGE_CACHE_TIMEOUT setting) is a positive number of
+    seconds. Pages are keyed by slug, the allowed query parameters and
+    the product content version, so signals purge them by bumping the
+    version.
+    '''
+    page_cache_timeout = None
+    page_cache_params = ('size',)
+
+    def get_page_cache_timeout(self):
+        '''
+        Return the number of seconds rendered pages are kept for.
+
+        Returns:
+            int: The timeout, or 0 when caching is disabled.
+        '''
+        if self.page_cache_timeout is not None:
+            return self.page_cache_timeout
+        return getattr(settings, 'PRODUCT_PAGE_CACHE_TIMEOUT', 0)
+
+    def get_page_cache_key(self, request, slug):
+        '''
+        Build the cache key for the current request.
+
+        Returns None when the request must not use the cache: logged in
+        users, pending flash messages or unexpected query parameters.
+
+        Args:
+            request: The current request object.
+            slug (str): The product slug.
+
+        Returns:
+            str or None: The cache key.
+        '''
+        if not self.get_page_cache_timeout() or not slug:
+            return None
+        if request.user.is_authenticated:
+            return None
+        if '_messages' in request.session:
+            return None
+        if any(key not in self.page_cache_params for key in request.GET):
+            return None
+
+        params = []
+        for param in self.page_cache_params:
+            value = request.GET.get(param, '')
+            if len(value) > 50:
+                return None
+            params.append(quote(value, safe=''))
+
+        versions = cache.get_many([_version_key(slug), CATALOG_VERSION_KEY])
+        page_version = (
+            versions.get(_version_key(slug)) or
+            _get_version(_version_key(slug))
+        )
+        catalog_version = (
+            versions.get(CATALOG_VERSION_KEY) or
+            _get_version(CATALOG_VERSION_KEY)
+        )
+
+        return (
+            f'product-page:{slug}:{":".join(params)}:'
+            f'{page_version}:{catalog_version}'
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        '''
+        Serve GET requests from the cache when possible, otherwise render
+        the page and store it for the next anonymous visitor.
+        '''
+        self.page_cache_key = None
+        if request.method == 'GET':
+            self.page_cache_key = self.get_page_cache_key(
+                request, kwargs.get('slug')
+            )
+        if not self.page_cache_key:
+            return super().dispatch(request, *args, **kwargs)
+
+        content = cache.get(self.page_cache_key)
+        if content is not None:
+            return HttpResponse(
+                content.replace(CSRF_PLACEHOLDER, get_token(request))
+            )
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or not hasattr(response, 'render'):
+            return response
+
+        content = response.render().content.decode(response.charset)
+        cache.set(self.page_cache_key, content, self.get_page_cache_timeout())
+        response.content = content.replace(
+            CSRF_PLACEHOLDER, get_token(request)
+        )
+        return response
+
+    def get_context_data(self, **kwargs):
+        '''
+        Render the CSRF token as a placeholder when the page is going to
+        be cached, so no visitor's token is ever stored.
+        '''
+        context = super().get_context_data(**kwargs)
+        if getattr(self, 'page_cache_key', None):
+            context['csrf_token'] = CSRF_PLACEHOLDER
+        return context
+
+
+def _conditional_state(request, compute, *args):
+    '''
+    Compute the ETag and Last-Modified values of a page once per request.
+
+    Conditional responses are skipped for unsafe methods and while flash
+    messages are pending, as those are rendered into the page.
+
+    Args:
+        request: The current request object.
+        compute (callable): Returns the values the page depends on.
+        *args: Arguments passed on to compute.
+
+    Returns:
+        dict or None: The 'etag' and 'last_modified' values.
+    '''
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if '_messages' in request.session:
+        return None
+
+    if not hasattr(request, '_conditional_state'):
+        values = compute(*args)
+        state = None
+        if values is not None:
+            user = request.user
+            values['user'] = (
+                (user.pk, user.is_staff, user.is_superuser)
+                if user.is_authenticated else None
+            )
+            timestamps = [
+                value for key, value in values.items()
+                if key.endswith('updated') and value is not None
+            ]
+            digest = hashlib.md5(
+                repr(sorted(values.items())).encode()
+            ).hexdigest()
+            state = {
+                'etag': f'W/"{digest}"',
+                'last_modified': max(timestamps) if timestamps else None,
+            }
+        request._conditional_state = state
+    return request._conditional_state
+
+
+def _product_detail_values(slug):
+    '''
+    Return the values a product detail page depends on, in one query.
+
+    Args:
+        slug (str): The product slug.
+
+    Returns:
+        dict or None: The values, or None if the product does not exist.
+    '''
+    variants = ProductVariant.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product')
+    reviews = ProductReview.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product')
+    recommendations = RelatedProduct.objects.filter(
+        product=OuterRef('pk')
+    ).order_by().values('product')
+    # Products that may be recommended: the related ones and, as
+    # fallback, the ones of the same category
+    candidates = Product.objects.filter(
+        Q(category=OuterRef('category')) |
+        Q(recommended_with__product=OuterRef('pk'))
+    ).order_by().annotate(group=Value(1)).values('group')
+
+    return Product.objects.filter(slug=slug).annotate(
+        variants_updated=Subquery(
+            variants.annotate(latest=Max('updated_at')).values('latest')
+        ),
+        variants_count=Subquery(
+            variants.annotate(total=Count('pk')).values('total')
+        ),
+        reviews_updated=Subquery(
+            reviews.annotate(latest=Max('updated_at')).values('latest')
+        ),
+        recommendations_updated=Subquery(
+            recommendations.annotate(
+                latest=Max('built_at')
+            ).values('latest')
+        ),
+        candidates_updated=Subquery(
+            candidates.annotate(
+                latest=Max('updated_at')
+            ).values('latest')
+        ),
+        # Reviews change the fallback order without touching updated_at
+        candidates_rating_sum=Subquery(
+            candidates.annotate(total=Sum('rating_sum')).values('total')
+        ),
+        candidates_rating_count=Subquery(
+            candidates.annotate(total=Sum('rating_count')).values('total')
+        ),
+    ).values(
+        'updated_at',
+        'rating_sum',
+        'rating_count',
+        'category__updated_at',
+        'variants_updated',
+        'variants_count',
+        'reviews_updated',
+        'recommendations_updated',
+        'candidates_updated',
+        'candidates_rating_sum',
+        'candidates_rating_count',
+    ).first()
+
+
+def _catalog_values():
+    '''
+    Return the values the product listing pages depend on.
+
+    Returns:
+        dict: The latest timestamps and counts of the catalog tables.
+    '''
+    values = Product.objects.aggregate(
+        products_updated=Max('updated_at'),
+        products_count=Count('pk'),
+        rating_sum=Sum('rating_sum'),
+        rating_count=Sum('rating_count'),
+        # Weighted by id as well, so sales moving between products count
+        units_sold_sum=Sum('units_sold'),
+        units_sold_ranked=Sum(F('units_sold') * F('pk')),
+    )
+    values.update(ProductVariant.objects.aggregate(
+        variants_updated=Max('updated_at'),
+        variants_count=Count('pk'),
+    ))
+    values.update(Category.objects.aggregate(
+        categories_updated=Max('updated_at'),
+        categories_count=Count('pk'),
+    ))
+    return values
+
+
+def product_detail_etag(request, slug, *args, **kwargs):
+    '''
+    Return the ETag of a product detail page.
+    '''
+    state = _conditional_state(request, _product_detail_values, slug)
+    return state['etag'] if state else None
+
+
+def product_detail_last_modified(request, slug, *args, **kwargs):
+    '''
+    Return the Last-Modified date of a product detail page.
+    '''
+    state = _conditional_state(request, _product_detail_values, slug)
+    return state['last_modified'] if state else None
+
+
+def catalog_etag(request, *args, **kwargs):
+    '''
+    Return the ETag of the product listing and home pages.
+    '''
+    state = _conditional_state(request, _catalog_values)
+    return state['etag'] if state else None
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    '''
+    Return the Last-Modified date of the product listing and home pages.
+    '''
+    state = _conditional_state(request, _catalog_values)
+    return state['last_modified'] if state else None
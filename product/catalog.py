@@ -0,0 +1,604 @@
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+# Django imports
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+# Internal imports
+from .cache import (
+    bump_catalog_version,
+    bump_category_version,
+    bump_page_version
+)
+from .models import (
+    Category,
+    Product,
+    ProductVariant,
+    ProductRatingHistogram,
+    make_slug
+)
+
+# Columns of the CSV format, one row per variant. Products without
+# variants are written as a single row with empty variant columns.
+CSV_FIELDS = (
+    'name',
+    'category',
+    'description',
+    'active',
+    'size',
+    'price',
+    'stock',
+    'variant_active',
+)
+
+FORMATS = ('csv', 'jsonl')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _parse_bool(value, default=True):
+    '''
+    Parse a boolean written as text or JSON.
+
+    Args:
+        value: The value to parse.
+        default (bool): The value used when empty.
+
+    Returns:
+        bool: The parsed value.
+
+    Raises:
+        ValidationError: If the value is not a boolean.
+    '''
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValidationError(f"'{value}' is not a boolean.")
+
+
+def read_csv(lines):
+    '''
+    Read products from CSV rows, merging consecutive rows of the same
+    product.
+
+    Args:
+        lines: An iterable of CSV lines, including the header.
+
+    Yields:
+        tuple: The line number where the product starts and its data.
+    '''
+    reader = csv.DictReader(lines)
+    item, line_no = None, None
+    for row in reader:
+        variant = {
+            'size': row.get('size'),
+            'price': row.get('price'),
+            'stock': row.get('stock'),
+            'active': row.get('variant_active'),
+        }
+        if item is None or item['name'] != row.get('name'):
+            if item is not None:
+                yield line_no, item
+            item, line_no = {
+                'name': row.get('name'),
+                'category': row.get('category'),
+                'description': row.get('description'),
+                'active': row.get('active'),
+                'variants': [],
+            }, reader.line_num
+        if variant['size']:
+            item['variants'].append(variant)
+    if item is not None:
+        yield line_no, item
+
+
+def read_jsonl(lines):
+    '''
+    Read products from JSON Lines, one product with its variants per
+    line.
+
+    Args:
+        lines: An iterable of JSON lines.
+
+    Yields:
+        tuple: The line number and product data.
+
+    Raises:
+        ValidationError: If a line is not a JSON object.
+    '''
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            raise ValidationError(f'Line {line_no} is not valid JSON.')
+        if not isinstance(item, dict):
+            raise ValidationError(f'Line {line_no} is not a JSON object.')
+        yield line_no, item
+
+
+@lru_cache(maxsize=1024)
+def _validate_category(name):
+    '''
+    Check a category name against the model fields, once per name.
+    '''
+    Category(name=name, slug=make_slug(name)).clean_fields(exclude=['slug'])
+
+
+def parse_product(item):
+    '''
+    Validate the data of one product and its variants.
+
+    Field values are checked against the model fields without querying
+    the database, so uniqueness is left to the upsert.
+
+    Args:
+        item (dict): The product data, as read from the file.
+
+    Returns:
+        dict: The cleaned product, category name and variants.
+
+    Raises:
+        ValidationError: If any value is invalid.
+    '''
+    name = (item.get('name') or '').strip()
+    category = (item.get('category') or '').strip()
+    _validate_category(category)
+
+    product = Product(
+        name=name,
+        slug=make_slug(name),
+        description=item.get('description') or '',
+        active=_parse_bool(item.get('active'))
+    )
+    product.clean_fields(exclude=['category', 'image_path'])
+    if not product.slug:
+        raise ValidationError(f"'{name}' does not produce a valid slug.")
+
+    variants = {}
+    for data in item.get('variants') or []:
+        try:
+            price = Decimal(str(data.get('price')))
+            stock = int(data.get('stock') or 0)
+        except (InvalidOperation, ValueError):
+            raise ValidationError(
+                f"Invalid price or stock for size '{data.get('size')}'."
+            )
+        variant = ProductVariant(
+            size=(data.get('size') or '').strip(),
+            price=price,
+            stock=stock,
+            active=_parse_bool(data.get('active'))
+        )
+        variant.clean_fields(exclude=['product'])
+        variants[variant.size] = variant
+
+    return {
+        'product': product,
+        'category': category,
+        'variants': variants,
+    }
+
+
+def _get_category_ids(names):
+    '''
+    Return the ids of the categories with the given names, creating the
+    missing ones.
+
+    Args:
+        names (set): Category names.
+
+    Returns:
+        tuple: The category ids keyed by name, and the number of
+            categories created.
+    '''
+    slugs = {name: make_slug(name) for name in names}
+    existing = dict(
+        Category.objects.filter(
+            slug__in=slugs.values()
+        ).values_list('slug', 'id')
+    )
+    missing = {
+        slug: Category(name=name, slug=slug)
+        for name, slug in slugs.items() if slug not in existing
+    }
+    if missing:
+        Category.objects.bulk_create(missing.values())
+        existing.update(
+            Category.objects.filter(
+                slug__in=list(missing)
+            ).values_list('slug', 'id')
+        )
+    return (
+        {name: existing[slug] for name, slug in slugs.items()},
+        len(missing)
+    )
+
+
+def _import_chunk(chunk, stats):
+    '''
+    Upsert a chunk of products and their variants in one transaction.
+
+    Products are matched on slug and variants on product and size.
+    Rating counters and images of existing products are left alone.
+
+    Args:
+        chunk (dict): Parsed products keyed by slug.
+        stats (dict): The running import statistics.
+    '''
+    with transaction.atomic():
+        category_ids, created = _get_category_ids(
+            {entry['category'] for entry in chunk.values()}
+        )
+        stats['categories'] += created
+
+        products = []
+        for entry in chunk.values():
+            product = entry['product']
+            product.category_id = category_ids[entry['category']]
+            products.append(product)
+
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=[
+                'name', 'category', 'description', 'active', 'updated_at'
+            ]
+        )
+        product_ids = dict(
+            Product.objects.filter(
+                slug__in=list(chunk)
+            ).values_list('slug', 'id')
+        )
+        ProductRatingHistogram.objects.bulk_create(
+            [
+                ProductRatingHistogram(product_id=product_id)
+                for product_id in product_ids.values()
+            ],
+            ignore_conflicts=True
+        )
+
+        variants = []
+        for slug, entry in chunk.items():
+            for variant in entry['variants'].values():
+                variant.product_id = product_ids[slug]
+                variants.append(variant)
+        if variants:
+            ProductVariant.objects.bulk_create(
+                variants,
+                update_conflicts=True,
+                unique_fields=['product', 'size'],
+                update_fields=['price', 'stock', 'active', 'updated_at']
+            )
+
+    stats['products'] += len(products)
+    stats['variants'] += len(variants)
+
+
+def import_catalog(lines, file_format, chunk_size=1000, progress=None):
+    '''
+    Import products with their variants from a CSV or JSON Lines stream.
+
+    The file is read lazily and written in chunks with bulk upserts,
+    bypassing Product.save and the model signals. Page caches, the
+    category registry and rating histograms are updated once for the
+    whole import instead.
+
+    Args:
+        lines: An iterable of text lines.
+        file_format (str): 'csv' or 'jsonl'.
+        chunk_size (int): Number of products written per transaction.
+        progress (callable): Called with the statistics after each chunk.
+
+    Returns:
+        dict: Counts of imported products, variants and created
+            categories, the invalid rows and the elapsed seconds.
+    '''
+    reader = read_csv if file_format == 'csv' else read_jsonl
+    stats = {'products': 0, 'variants': 0, 'categories': 0, 'errors': []}
+    started = time.monotonic()
+
+    chunk = {}
+    for line_no, item in reader(lines):
+        try:
+            entry = parse_product(item)
+        except ValidationError as e:
+            stats['errors'].append((line_no, '; '.join(e.messages)))
+            continue
+
+        slug = entry['product'].slug
+        if slug in chunk:
+            entry['variants'] = {
+                **chunk[slug]['variants'], **entry['variants']
+            }
+        chunk[slug] = entry
+
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, stats)
+            chunk = {}
+            if progress:
+                progress(stats)
+
+    if chunk:
+        _import_chunk(chunk, stats)
+        if progress:
+            progress(stats)
+
+    if stats['categories']:
+        bump_category_version()
+    if stats['products']:
+        bump_catalog_version()
+
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+def _product_rows(product):
+    '''
+    Return the CSV rows of a product, one per variant.
+    '''
+    base = {
+        'name': product.name,
+        'category': product.category.name,
+        'description': product.description or '',
+        'active': product.active,
+    }
+    variants = product.variants.all()
+    if not variants:
+        return [base]
+    return [
+        {
+            **base,
+            'size': variant.size,
+            'price': variant.price,
+            'stock': variant.stock,
+            'variant_active': variant.active,
+        }
+        for variant in variants
+    ]
+
+
+def export_catalog(output, file_format, chunk_size=1000):
+    '''
+    Write every product with its variants to a CSV or JSON Lines stream.
+
+    Products are read in chunks of chunk_size, each with one query for
+    its variants, so memory use stays flat for large catalogs.
+
+    Args:
+        output: A writable text stream.
+        file_format (str): 'csv' or 'jsonl'.
+        chunk_size (int): Number of products read per query.
+
+    Returns:
+        dict: Counts of exported products and variants and the elapsed
+            seconds.
+    '''
+    started = time.monotonic()
+    stats = {'products': 0, 'variants': 0}
+
+    products = Product.objects.select_related('category').prefetch_related(
+        Prefetch('variants', queryset=ProductVariant.objects.order_by('size'))
+    ).order_by('id')
+
+    writer = None
+    if file_format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    for product in products.iterator(chunk_size=chunk_size):
+        variants = product.variants.all()
+        stats['products'] += 1
+        stats['variants'] += len(variants)
+
+        if writer:
+            writer.writerows(_product_rows(product))
+            continue
+
+        output.write(json.dumps({
+            'name': product.name,
+            'category': product.category.name,
+            'description': product.description or '',
+            'active': product.active,
+            'variants': [
+                {
+                    'size': variant.size,
+                    'price': str(variant.price),
+                    'stock': variant.stock,
+                    'active': variant.active,
+                }
+                for variant in variants
+            ],
+        }) + '\n')
+
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+# Largest number of rows accepted by apply_variant_updates
+MAX_VARIANT_UPDATES = 5000
+
+
+def _parse_variant_update(row):
+    '''
+    Validate the values of one variant update row.
+
+    Args:
+        row (dict): The update, identifying the variant by 'id' or by
+            'product' slug and 'size', with any of 'stock',
+            'stock_delta', 'price' and 'active'.
+
+    Returns:
+        dict: The cleaned key and changes.
+
+    Raises:
+        ValidationError: If the row is invalid.
+    '''
+    if not isinstance(row, dict):
+        raise ValidationError('Each update must be an object.')
+
+    if row.get('id') not in (None, ''):
+        try:
+            key = int(row['id'])
+        except (TypeError, ValueError):
+            raise ValidationError('Invalid variant id.')
+    elif row.get('product') and row.get('size'):
+        key = (str(row['product']), str(row['size']))
+    else:
+        raise ValidationError('Provide a variant id or product and size.')
+
+    if 'stock' in row and 'stock_delta' in row:
+        raise ValidationError('Provide either stock or stock_delta.')
+
+    changes = {}
+    try:
+        if 'stock' in row:
+            changes['stock'] = int(row['stock'])
+            if changes['stock'] < 0:
+                raise ValidationError('Stock cannot be negative.')
+        if 'stock_delta' in row:
+            changes['stock_delta'] = int(row['stock_delta'])
+    except (TypeError, ValueError):
+        raise ValidationError('Stock must be a whole number.')
+    if 'price' in row:
+        changes['price'] = ProductVariant._meta.get_field('price').clean(
+            row['price'], None
+        )
+    if 'active' in row:
+        changes['active'] = _parse_bool(row['active'])
+
+    if not changes:
+        raise ValidationError('Nothing to update.')
+    return {'key': key, 'changes': changes}
+
+
+def apply_variant_updates(rows):
+    '''
+    Apply a batch of stock and price updates to product variants.
+
+    All rows are validated against the locked variants before anything
+    is written, and the batch is saved with one bulk_update. If any row
+    is invalid, nothing is changed.
+
+    Args:
+        rows (list): Update rows, see _parse_variant_update.
+
+    Returns:
+        tuple: Whether the batch was applied, and a result per row with
+            either the new variant values or the error.
+    '''
+    if not isinstance(rows, list) or not rows:
+        raise ValidationError('Provide a non-empty list of updates.')
+    if len(rows) > MAX_VARIANT_UPDATES:
+        raise ValidationError(
+            f'At most {MAX_VARIANT_UPDATES} updates can be sent at once.'
+        )
+
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append(_parse_variant_update(row))
+        except ValidationError as e:
+            parsed.append({'error': '; '.join(e.messages)})
+
+    ids = {
+        entry['key'] for entry in parsed
+        if isinstance(entry.get('key'), int)
+    }
+    pairs = {
+        entry['key'] for entry in parsed
+        if isinstance(entry.get('key'), tuple)
+    }
+
+    with transaction.atomic():
+        variants = ProductVariant.objects.select_for_update().select_related(
+            'product'
+        ).filter(
+            Q(id__in=ids) |
+            Q(
+                product__slug__in={slug for slug, _ in pairs},
+                size__in={size for _, size in pairs}
+            )
+        )
+        by_id, by_pair = {}, {}
+        for variant in variants:
+            by_id[variant.id] = variant
+            by_pair[(variant.product.slug, variant.size)] = variant
+
+        results, changed = [], {}
+        now = timezone.now()
+        for index, entry in enumerate(parsed):
+            if 'error' in entry:
+                results.append({
+                    'index': index, 'success': False, 'error': entry['error']
+                })
+                continue
+
+            key = entry['key']
+            variant = (by_id if isinstance(key, int) else by_pair).get(key)
+            if variant is None:
+                results.append({
+                    'index': index,
+                    'success': False,
+                    'error': 'Variant not found.'
+                })
+                continue
+
+            changes = entry['changes']
+            stock = changes.get('stock', variant.stock)
+            stock += changes.get('stock_delta', 0)
+            if stock < 0:
+                results.append({
+                    'index': index,
+                    'success': False,
+                    'error': f'Stock would become negative ({stock}).'
+                })
+                continue
+
+            variant.stock = stock
+            variant.price = changes.get('price', variant.price)
+            variant.active = changes.get('active', variant.active)
+            variant.updated_at = now
+            changed[variant.id] = variant
+            results.append({
+                'index': index,
+                'success': True,
+                'variant_id': variant.id,
+                'product': variant.product.slug,
+                'size': variant.size,
+                'stock': variant.stock,
+                'price': str(variant.price),
+                'active': variant.active,
+            })
+
+        applied = all(result['success'] for result in results)
+        if applied:
+            ProductVariant.objects.bulk_update(
+                changed.values(),
+                ['stock', 'price', 'active', 'updated_at'],
+                batch_size=1000
+            )
+            slugs = {variant.product.slug for variant in changed.values()}
+
+            def purge_pages():
+                for slug in slugs:
+                    bump_page_version(slug)
+
+            transaction.on_commit(purge_pages)
+
+    return applied, results
@@ -0,0 +1,334 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+
+# Django imports
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.templatetags.static import static
+from django.urls import reverse
+
+# Third-party imports
+from cloudinary.uploader import upload, destroy
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Widths offered to the browser through srcset, per view
+LIST_WIDTHS = (320, 480, 640)
+DETAIL_WIDTHS = (480, 800, 1200)
+
+
+@lru_cache(maxsize=None)
+def placeholder_image():
+    '''
+    Return the URL of the placeholder shown for products without image.
+
+    Returns:
+        str: The static URL of the placeholder image.
+    '''
+    return static('images/product-holder.webp')
+
+
+class CloudinaryImageBackend:
+    '''
+    Store product images on Cloudinary and render them through its
+    on-the-fly transformations.
+    '''
+    name = 'cloudinary'
+
+    def store(self, image_file, public_id):
+        '''
+        Upload an image, replacing any upload with the same public id.
+
+        Args:
+            image_file: The uploaded file.
+            public_id (str): The public id to upload the image as.
+
+        Returns:
+            tuple: The public id and version of the upload.
+        '''
+        result = upload(
+            image_file,
+            public_id=public_id,
+            overwrite=True,
+            resource_type='image'
+        )
+        return result['public_id'], result.get('version')
+
+    def delete(self, public_id):
+        '''
+        Delete an uploaded image.
+
+        Args:
+            public_id (str): The public id of the image.
+        '''
+        destroy(public_id)
+
+    def build_urls(self, public_id, version):
+        '''
+        Build the URLs of an uploaded image.
+
+        The list view uses the 'Thumbnail' named transformation, the
+        detail view the original upload. Both come with a srcset of
+        width-limited, automatically formatted renditions.
+
+        Args:
+            public_id (str): The public id of the image.
+            version (str): The version of the upload.
+
+        Returns:
+            dict: The 'list', 'detail', 'list_srcset' and 'detail_srcset'
+                values, empty when Cloudinary is not configured.
+        '''
+        cloud_name = settings.CLOUDINARY_STORAGE.get('CLOUD_NAME')
+        if not cloud_name:
+            return {}
+
+        base = f'https://res.cloudinary.com/{cloud_name}/image/upload/'
+        path = f'v{version or None}/{public_id}'
+
+        def srcset(prefix, widths):
+            return ', '.join(
+                f'{base}{prefix}c_limit,f_auto,q_auto,w_{width}/{path} '
+                f'{width}w'
+                for width in widths
+            )
+
+        return {
+            'list': f'{base}t_Thumbnail/{path}',
+            'detail': f'{base}{path}',
+            'list_srcset': srcset('t_Thumbnail/', LIST_WIDTHS),
+            'detail_srcset': srcset('', DETAIL_WIDTHS),
+        }
+
+
+class LocalImageBackend:
+    '''
+    Generate WebP (and AVIF, when Pillow supports it) renditions of
+    product images with Pillow and keep them on disk.
+
+    Renditions are stored under PRODUCT_IMAGE_ROOT in a directory named
+    after a hash of the original file, so identical uploads share files
+    and their URLs never change content.
+    '''
+    name = 'local'
+    prefix = 'local/'
+    widths = tuple(sorted(set(LIST_WIDTHS + DETAIL_WIDTHS)))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def formats():
+        '''
+        Return the formats renditions are generated in, preferred first.
+
+        AVIF needs a Pillow build with AVIF support (Pillow 11.3+).
+
+        Returns:
+            tuple: (format, extension) pairs.
+        '''
+        if 'avif' in features.modules and features.check_module('avif'):
+            return (('AVIF', 'avif'), ('WEBP', 'webp'))
+        return (('WEBP', 'webp'),)
+
+    @staticmethod
+    def directory(digest):
+        '''
+        Return the directory holding the renditions of an image.
+
+        Args:
+            digest (str): The content hash of the original image.
+
+        Returns:
+            str: The directory path.
+        '''
+        return os.path.join(settings.PRODUCT_IMAGE_ROOT, digest)
+
+    def store(self, image_file, public_id):
+        '''
+        Generate and store the renditions of an uploaded image.
+
+        Args:
+            image_file: The uploaded file.
+            public_id (str): Unused, renditions are content-addressed.
+
+        Returns:
+            tuple: The image identifier and an empty version.
+
+        Raises:
+            ValidationError: If the file is not a readable image.
+        '''
+        data = image_file.read()
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        directory = self.directory(digest)
+
+        if not os.path.isdir(directory):
+            try:
+                image = Image.open(BytesIO(data))
+                image = ImageOps.exif_transpose(image)
+            except (UnidentifiedImageError, OSError):
+                raise ValidationError('Invalid image file.')
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+
+            os.makedirs(settings.PRODUCT_IMAGE_ROOT, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=settings.PRODUCT_IMAGE_ROOT)
+            for width in self.widths:
+                rendition = image.copy()
+                if rendition.width > width:
+                    rendition.thumbnail(
+                        (width, rendition.height), Image.LANCZOS
+                    )
+                for image_format, extension in self.formats():
+                    rendition.save(
+                        os.path.join(staging, f'{width}.{extension}'),
+                        image_format,
+                        quality=80
+                    )
+            try:
+                os.rename(staging, directory)
+            except OSError:
+                # Another request stored the same image meanwhile
+                for name in os.listdir(staging):
+                    os.remove(os.path.join(staging, name))
+                os.rmdir(staging)
+
+        return f'{self.prefix}{digest}', None
+
+    def delete(self, public_id):
+        '''
+        Keep renditions on disk, as identical uploads share them.
+        '''
+
+    def build_urls(self, public_id, version):
+        '''
+        Build the URLs of a stored image.
+
+        Args:
+            public_id (str): The image identifier.
+            version (str): Unused.
+
+        Returns:
+            dict: The 'list', 'detail', 'list_srcset' and 'detail_srcset'
+                values.
+        '''
+        digest = public_id[len(self.prefix):]
+
+        def url(width):
+            return reverse(
+                'product_image', kwargs={'digest': digest, 'width': width}
+            )
+
+        def srcset(widths):
+            return ', '.join(f'{url(width)} {width}w' for width in widths)
+
+        return {
+            'list': url(LIST_WIDTHS[1]),
+            'detail': url(DETAIL_WIDTHS[-1]),
+            'list_srcset': srcset(LIST_WIDTHS),
+            'detail_srcset': srcset(DETAIL_WIDTHS),
+        }
+
+
+BACKENDS = {
+    CloudinaryImageBackend.name: CloudinaryImageBackend(),
+    LocalImageBackend.name: LocalImageBackend(),
+}
+
+
+def get_image_backend():
+    '''
+    Return the backend new images are stored with, chosen by the
+    PRODUCT_IMAGE_BACKEND setting.
+
+    Returns:
+        The image backend instance.
+    '''
+    return BACKENDS[getattr(settings, 'PRODUCT_IMAGE_BACKEND', 'cloudinary')]
+
+
+def backend_for(public_id):
+    '''
+    Return the backend an existing image was stored with.
+
+    Args:
+        public_id (str): The image identifier.
+
+    Returns:
+        The image backend instance.
+    '''
+    if public_id.startswith(LocalImageBackend.prefix):
+        return BACKENDS[LocalImageBackend.name]
+    return BACKENDS[CloudinaryImageBackend.name]
+
+
+def _public_id(image_path):
+    '''
+    Return the public id of a CloudinaryField value.
+    '''
+    if not image_path:
+        return ''
+    if hasattr(image_path, 'public_id'):
+        return image_path.public_id
+    return str(image_path)
+
+
+def image_source(image_path, version):
+    '''
+    Identify the uploaded image a set of URLs was built from.
+
+    Args:
+        image_path: The CloudinaryField value or its public id.
+        version (str): The Cloudinary version of the upload.
+
+    Returns:
+        str: The public id and version, or an empty string without image.
+    '''
+    public_id = _public_id(image_path)
+    if not public_id:
+        return ''
+    return f'{public_id}@{version or ""}'
+
+
+def build_image_urls(image_path, version):
+    '''
+    Build every URL a product image is rendered with.
+
+    Args:
+        image_path: The CloudinaryField value or its public id.
+        version (str): The Cloudinary version of the upload.
+
+    Returns:
+        dict: The image source and, when available, the 'list',
+            'detail', 'list_srcset' and 'detail_srcset' values.
+    '''
+    public_id = _public_id(image_path)
+    urls = {'source': image_source(image_path, version)}
+    if public_id:
+        urls.update(backend_for(public_id).build_urls(public_id, version))
+    return urls
+
+
+def store_product_image(product, image_file):
+    '''
+    Store a new image for a product with the configured backend and
+    remove the image it replaces.
+
+    The product is updated but not saved.
+
+    Args:
+        product (Product): The product the image belongs to.
+        image_file: The uploaded file.
+
+    Raises:
+        ValidationError: If the file is not a readable image.
+    '''
+    previous_id = _public_id(product.image_path)
+    public_id, version = get_image_backend().store(
+        image_file, f'products/{product.slug}'
+    )
+    if previous_id and previous_id != public_id:
+        backend_for(previous_id).delete(previous_id)
+
+    product.image_path = public_id
+    product.cloudinary_version = version
@@ -0,0 +1,216 @@
+import logging
+import time
+from datetime import timedelta
+
+# Django imports
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+# Third-party imports
+from PIL import Image, UnidentifiedImageError
+
+# Internal imports
+from .images import store_product_image
+from .models import ProductImageJob
+
+logger = logging.getLogger(__name__)
+
+# Jobs failing with unexpected errors are retried up to this many times
+MAX_ATTEMPTS = 3
+
+# Processing jobs not updated for this long are assumed to belong to a
+# worker that died, and are queued again
+STALE_AFTER = timedelta(minutes=10)
+
+
+def enqueue_image_upload(product, image_file, user=None):
+    '''
+    Check an uploaded image and stage it for the image worker.
+
+    Args:
+        product (Product): The product the image belongs to.
+        image_file: The uploaded file.
+        user (User): The user uploading the image.
+
+    Returns:
+        ProductImageJob: The queued job.
+
+    Raises:
+        ValidationError: If the file is not a readable image.
+    '''
+    try:
+        Image.open(image_file).verify()
+    except (UnidentifiedImageError, OSError):
+        raise ValidationError('Invalid image file.')
+    image_file.seek(0)
+
+    return ProductImageJob.objects.create(
+        product=product,
+        file_name=(image_file.name or 'image')[:255],
+        data=image_file.read(),
+        created_by=user if user and user.is_authenticated else None
+    )
+
+
+def image_job_status(job):
+    '''
+    Describe the state of a job for the admin UI.
+
+    Args:
+        job (ProductImageJob): The image job.
+
+    Returns:
+        dict: The job id, status, progress, error and status URL, plus
+            the new product image once the job is done.
+    '''
+    status = {
+        'id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'finished': job.finished,
+        'error': job.error,
+        'status_url': reverse('product_image_job', kwargs={'pk': job.pk}),
+    }
+    if job.status == ProductImageJob.STATUS_DONE:
+        status['image'] = job.product.image()
+    return status
+
+
+def _update_job(job, **fields):
+    '''
+    Write the given fields of a job, leaving the rest of the row alone.
+    '''
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=[*fields, 'updated_at'])
+
+
+def requeue_stale_jobs():
+    '''
+    Queue again the jobs of workers that stopped while processing them,
+    and fail those that stopped during their last attempt.
+
+    Returns:
+        int: The number of jobs queued again.
+    '''
+    now = timezone.now()
+    stale = ProductImageJob.objects.filter(
+        status=ProductImageJob.STATUS_PROCESSING,
+        updated_at__lt=now - STALE_AFTER
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=ProductImageJob.STATUS_FAILED,
+        error='The image worker stopped while processing the image.',
+        data=b'',
+        updated_at=now
+    )
+    return stale.filter(attempts__lt=MAX_ATTEMPTS).update(
+        status=ProductImageJob.STATUS_PENDING, progress=0
+    )
+
+
+def claim_next_job():
+    '''
+    Take the oldest pending job, making sure no other worker takes it.
+
+    Returns:
+        ProductImageJob or None: The claimed job.
+    '''
+    pending = ProductImageJob.objects.filter(
+        status=ProductImageJob.STATUS_PENDING
+    )
+    for job_id in pending.values_list('id', flat=True)[:10]:
+        claimed = pending.filter(id=job_id).update(
+            status=ProductImageJob.STATUS_PROCESSING,
+            progress=5,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now()
+        )
+        if claimed:
+            return ProductImageJob.objects.select_related(
+                'product'
+            ).get(id=job_id)
+    return None
+
+
+def process_image_job(job):
+    '''
+    Store the staged image of a job with the image backend and update
+    the product.
+
+    Invalid images fail the job at once. Other errors queue it again
+    until MAX_ATTEMPTS is reached.
+
+    Args:
+        job (ProductImageJob): A claimed job.
+    '''
+    product = job.product
+    image_file = SimpleUploadedFile(job.file_name, bytes(job.data))
+
+    try:
+        _update_job(job, progress=20)
+        store_product_image(product, image_file)
+        _update_job(job, progress=90)
+        product.save(update_fields=[
+            'image_path', 'cloudinary_version', 'image_urls', 'updated_at'
+        ])
+    except ValidationError as e:
+        _update_job(
+            job,
+            status=ProductImageJob.STATUS_FAILED,
+            error=e.messages[0],
+            data=b''
+        )
+        return
+    except Exception as e:
+        logger.exception('Image job %s failed', job.pk)
+        if job.attempts >= MAX_ATTEMPTS:
+            _update_job(
+                job,
+                status=ProductImageJob.STATUS_FAILED,
+                error=str(e),
+                data=b''
+            )
+        else:
+            _update_job(
+                job,
+                status=ProductImageJob.STATUS_PENDING,
+                progress=0,
+                error=str(e)
+            )
+        return
+
+    _update_job(
+        job,
+        status=ProductImageJob.STATUS_DONE,
+        progress=100,
+        error='',
+        data=b''
+    )
+
+
+def run_worker(once=False, interval=2):
+    '''
+    Process image jobs as they are queued.
+
+    Args:
+        once (bool): Stop when no pending job is left.
+        interval (float): Seconds to wait between checks for new jobs.
+
+    Returns:
+        int: The number of jobs processed.
+    '''
+    processed = 0
+    while True:
+        requeue_stale_jobs()
+        job = claim_next_job()
+        if job is not None:
+            process_image_job(job)
+            processed += 1
+            continue
+        if once:
+            return processed
+        time.sleep(interval)
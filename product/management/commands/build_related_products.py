@@ -0,0 +1,58 @@
+import datetime
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Internal imports
+from product.recommendations import build_related_products
+
+
+class Command(BaseCommand):
+    '''
+    Precompute the "frequently bought together" products shown on the
+    product pages from the order history. Meant to run periodically,
+    e.g. nightly from a scheduler.
+    '''
+    help = 'Rebuild the products recommended on each product page.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=8,
+            help='Recommendations kept per product.'
+        )
+        parser.add_argument(
+            '--min-orders',
+            type=int,
+            default=2,
+            help='Orders two products must share to be recommended.'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Only use the orders of the last DAYS days.'
+        )
+
+    def handle(self, *args, **options):
+        if options['top_k'] < 1 or options['min_orders'] < 1:
+            raise CommandError('--top-k and --min-orders must be positive.')
+
+        since = None
+        if options['days']:
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+
+        started = time.perf_counter()
+        stored = build_related_products(
+            top_k=options['top_k'],
+            min_orders=options['min_orders'],
+            since=since
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Stored {stored} recommendation(s) in '
+                f'{time.perf_counter() - started:.1f}s.'
+            )
+        )
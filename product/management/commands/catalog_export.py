@@ -0,0 +1,61 @@
+import sys
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Internal imports
+from product.catalog import FORMATS, export_catalog
+
+
+class Command(BaseCommand):
+    '''
+    Export all products and their variants to a CSV or JSON Lines file
+    that catalog_import can read back.
+    '''
+    help = 'Export products and variants to a CSV or JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File to write, or '-' to write to standard output."
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='File format. Defaults to the file extension.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of products read per query.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                'Unknown file format, use --format csv or --format jsonl.'
+            )
+
+        try:
+            if path == '-':
+                stats = export_catalog(
+                    sys.stdout, file_format, options['chunk_size']
+                )
+            else:
+                with open(path, 'w', newline='', encoding='utf-8') as output:
+                    stats = export_catalog(
+                        output, file_format, options['chunk_size']
+                    )
+        except OSError as e:
+            raise CommandError(f'Could not write {path}: {e}')
+
+        rows = stats['products'] + stats['variants']
+        rate = rows / stats['elapsed'] if stats['elapsed'] else rows
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {stats['products']} products and "
+            f"{stats['variants']} variants "
+            f"in {stats['elapsed']:.2f}s, {rate:.0f} rows/s."
+        ))
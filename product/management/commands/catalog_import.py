@@ -0,0 +1,83 @@
+import sys
+
+# Django imports
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+# Internal imports
+from product.catalog import FORMATS, import_catalog
+
+
+class Command(BaseCommand):
+    '''
+    Import products and their variants from a CSV or JSON Lines file.
+
+    Products are matched on slug and variants on product and size, so
+    the same file can be imported again to update prices and stock.
+    '''
+    help = 'Import products and variants from a CSV or JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File to import, or '-' to read from standard input."
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='File format. Defaults to the file extension.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of products written per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                'Unknown file format, use --format csv or --format jsonl.'
+            )
+
+        def progress(stats):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f"{stats['products']} products, "
+                    f"{stats['variants']} variants imported..."
+                )
+
+        try:
+            if path == '-':
+                stats = import_catalog(
+                    sys.stdin, file_format, options['chunk_size'], progress
+                )
+            else:
+                with open(path, newline='', encoding='utf-8') as lines:
+                    stats = import_catalog(
+                        lines, file_format, options['chunk_size'], progress
+                    )
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        except (ValidationError, IntegrityError) as e:
+            raise CommandError(f'Import stopped: {e}')
+
+        for line_no, error in stats['errors'][:20]:
+            self.stderr.write(f'Line {line_no}: {error}')
+        if len(stats['errors']) > 20:
+            self.stderr.write(
+                f"... and {len(stats['errors']) - 20} more invalid rows."
+            )
+
+        rows = stats['products'] + stats['variants']
+        rate = rows / stats['elapsed'] if stats['elapsed'] else rows
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['products']} products and "
+            f"{stats['variants']} variants "
+            f"({stats['categories']} new categories, "
+            f"{len(stats['errors'])} invalid rows) "
+            f"in {stats['elapsed']:.2f}s, {rate:.0f} rows/s."
+        ))
@@ -0,0 +1,34 @@
+# Django imports
+from django.core.management.base import BaseCommand
+
+# Internal imports
+from product.jobs import run_worker
+
+
+class Command(BaseCommand):
+    '''
+    Run the worker processing product image uploads queued by the
+    product save and create views.
+    '''
+    help = 'Process queued product image uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no pending job is left.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Seconds to wait between checks for new jobs.'
+        )
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            once=options['once'], interval=options['interval']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} image job(s).')
+        )
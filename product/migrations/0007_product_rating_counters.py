@@ -0,0 +1,46 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:32
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_counters(apps, schema_editor):
+    '''
+    Populate the rating counters from the existing reviews.
+    '''
+    Product = apps.get_model('product', 'Product')
+    totals = Product.objects.annotate(
+        total=Sum('reviews__rating'),
+        amount=Count('reviews'),
+    )
+    for product in totals:
+        product.rating_sum = product.total or 0
+        product.rating_count = product.amount
+        product.rating = (
+            round(product.rating_sum / product.rating_count, 1)
+            if product.rating_count else 0.0
+        )
+        product.save(update_fields=['rating_sum', 'rating_count', 'rating'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_alter_productvariant_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews.'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of all review ratings.'),
+        ),
+        migrations.RunPython(
+            backfill_rating_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:35
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_histograms(apps, schema_editor):
+    '''
+    Create a rating histogram for every product from its reviews.
+    '''
+    Product = apps.get_model('product', 'Product')
+    ProductReview = apps.get_model('product', 'ProductReview')
+    ProductRatingHistogram = apps.get_model(
+        'product', 'ProductRatingHistogram'
+    )
+
+    histograms = {
+        pk: ProductRatingHistogram(product_id=pk)
+        for pk in Product.objects.values_list('pk', flat=True)
+    }
+    counts = (
+        ProductReview.objects.values('product_id', 'rating')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for entry in counts:
+        if 0 <= entry['rating'] <= 5:
+            setattr(
+                histograms[entry['product_id']],
+                f'rating_{entry["rating"]}',
+                entry['count']
+            )
+
+    ProductRatingHistogram.objects.bulk_create(
+        histograms.values(), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_product_rating_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRatingHistogram',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_histogram', serialize=False, to='product.product')),
+                ('rating_0', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='productreview',
+            name='rating',
+            field=models.IntegerField(help_text='Integer rating 0-5', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', '-created_at'], name='review_product_recent_idx'),
+        ),
+        migrations.RunPython(
+            backfill_rating_histograms, migrations.RunPython.noop
+        ),
+    ]
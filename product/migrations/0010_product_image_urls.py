@@ -0,0 +1,84 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_image_urls(image_path, version):
+    '''
+    Build the URLs of a Cloudinary product image.
+
+    A frozen copy of product.images.build_image_urls at the time of this
+    migration, so later changes to it cannot alter the backfill.
+    '''
+    if not image_path:
+        return {'source': ''}
+    public_id = (
+        image_path.public_id
+        if hasattr(image_path, 'public_id')
+        else str(image_path)
+    )
+    source = f'{public_id}@{version or ""}'
+    cloud_name = settings.CLOUDINARY_STORAGE.get('CLOUD_NAME')
+    if not cloud_name:
+        return {'source': source}
+
+    base = f'https://res.cloudinary.com/{cloud_name}/image/upload/'
+    path = f'v{version or None}/{public_id}'
+
+    def srcset(prefix, widths):
+        return ', '.join(
+            f'{base}{prefix}c_limit,f_auto,q_auto,w_{width}/{path} {width}w'
+            for width in widths
+        )
+
+    return {
+        'source': source,
+        'list': f'{base}t_Thumbnail/{path}',
+        'detail': f'{base}{path}',
+        'list_srcset': srcset('t_Thumbnail/', (320, 480, 640)),
+        'detail_srcset': srcset('', (480, 800, 1200)),
+    }
+
+
+def backfill_image_urls(apps, schema_editor):
+    '''
+    Store the image URLs of every product that has an image.
+    '''
+    Product = apps.get_model('product', 'Product')
+
+    products = list(
+        Product.objects.exclude(image_path__isnull=True).exclude(
+            image_path=''
+        ).only('id', 'image_path', 'cloudinary_version')
+    )
+    for product in products:
+        product.image_urls = build_image_urls(
+            product.image_path, product.cloudinary_version
+        )
+    Product.objects.bulk_update(products, ['image_urls'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_category_updated_at_productreview_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_urls',
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text=(
+                    'Image URLs built from image_path and cloudinary_version.'
+                )
+            ),
+        ),
+        migrations.RunPython(
+            backfill_image_urls, migrations.RunPython.noop
+        ),
+    ]
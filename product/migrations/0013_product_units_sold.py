@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2026-10-19 19:34
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_units_sold(apps, schema_editor):
+    '''
+    Score the existing products from the daily sales of the window.
+    '''
+    Product = apps.get_model('product', 'Product')
+    DailySales = apps.get_model('checkout', 'DailySales')
+    start = timezone.localdate() - datetime.timedelta(
+        days=settings.BEST_SELLER_DAYS - 1
+    )
+    Product.objects.update(
+        units_sold=Coalesce(
+            Subquery(
+                DailySales.objects.filter(
+                    product=OuterRef('pk'), date__gte=start
+                ).values('product').annotate(
+                    total=Sum('units')
+                ).values('total')
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checkout', '0011_daily_sales'),
+        ('product', '0012_related_products'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='units_sold',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Units sold over the last BEST_SELLER_DAYS days.'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-units_sold', 'name'], name='product_best_selling_idx'),
+        ),
+        migrations.RunPython(
+            backfill_units_sold, migrations.RunPython.noop
+        ),
+    ]
@@ -3,18 +3,38 @@ import re
 # Django imports
 from django.db import models
 from django.urls import reverse
-from django.templatetags.static import static
 from django.conf import settings
-from django.db.models import Avg
+from django.db.models import (
+    F,
+    Count,
+    Case,
+    When,
+    Value,
+    FloatField
+)
+from django.db.models.functions import Cast, Round
 
 # Third-party imports
 from cloudinary.models import CloudinaryField
-from cloudinary.api import resource
-from cloudinary.exceptions import NotFound
-from cloudinary.utils import cloudinary_url
 
 # Internal imports
-from django.core.validators import MinValueValidator
+from django.core.validators import MinValueValidator, MaxValueValidator
+from .images import build_image_urls, image_source, placeholder_image
+
+
+def make_slug(name):
+    '''
+    Build the slug of a category or product from its name.
+
+    Args:
+        name (str): The category or product name.
+
+    Returns:
+        str: The lowercase slug, with spaces and dashes as underscores.
+    '''
+    clean_name = re.sub(r'[^\w\s-]', '', name)
+    clean_name = clean_name.replace('-', '_').replace(' ', '_')
+    return clean_name.lower()
 
 
 class Category(models.Model):
@@ -25,6 +45,8 @@ class Category(models.Model):
         name (str): The name of the category.
         slug (str): The unique slug identifier for the category.
         created_at (datetime): Timestamp for when the category was created.
+        updated_at (datetime): Timestamp for when the category was last
+            updated.
     '''
     name = models.CharField(
         max_length=20,
@@ -41,14 +63,13 @@ class Category(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         '''
         Override the save method to generate a clean slug from the name.
         '''
-        clean_name = re.sub(r'[^\w\s-]', '', self.name)
-        clean_name = clean_name.replace('-', '_').replace(' ', '_')
-        self.slug = clean_name.lower()
+        self.slug = make_slug(self.name)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -69,6 +90,9 @@ class Product(models.Model):
         category (Category): The associated category for the product.
         description (str): A short description of the product.
         rating (float): The average rating of the product.
+        rating_sum (int): Sum of all review ratings.
+        rating_count (int): Number of reviews.
+        units_sold (int): Units sold over the best-seller window.
         image_path (CloudinaryField): The image of the product.
         active (bool): Whether the product is active.
         created_at (datetime): Timestamp for when the product was created.
@@ -106,6 +130,24 @@ class Product(models.Model):
         help_text='Average rating (0-5).'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Sum of all review ratings.'
+    )
+
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of reviews.'
+    )
+
+    units_sold = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Units sold over the last BEST_SELLER_DAYS days.'
+    )
+
     image_path = CloudinaryField(
         'image',
         blank=True,
@@ -125,73 +167,150 @@ class Product(models.Model):
         null=True
     )
 
+    image_urls = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Image URLs built from image_path and cloudinary_version.'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-units_sold', 'name'],
+                name='product_best_selling_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
+    # Only ever written through adjust_rating, never by a full-row save
+    RATING_FIELDS = ('rating', 'rating_sum', 'rating_count')
+
+    # Only ever written by checkout.sales, never by a full-row save
+    SALES_FIELDS = ('units_sold',)
+
     def save(self, *args, **kwargs):
         '''
-        Override the save method to generate a slug and update ratings.
+        Override the save method to generate a slug.
 
-        Preserves existing 'active' status and ensures category consistency.
+        Existing products are saved without the rating and sales fields so
+        a stale instance never overwrites counters updated by new reviews
+        or orders.
         '''
-        if self.pk:
-            original = Product.objects.get(pk=self.pk)
-            if not hasattr(self, 'active'):
-                self.active = original.active
-
         if self.name:
-            clean_name = re.sub(r'[^\w\s-]', '', self.name)
-            clean_name = clean_name.replace('-', '_').replace(' ', '_')
-            self.slug = clean_name.lower()
+            self.slug = make_slug(self.name)
+
+        source = image_source(self.image_path, self.cloudinary_version)
+        if (
+            self.image_urls.get('source') != source
+            or (source and 'detail' not in self.image_urls)
+        ):
+            self.image_urls = build_image_urls(
+                self.image_path, self.cloudinary_version
+            )
+
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+                and field.name not in self.SALES_FIELDS
+            ]
 
         super().save(*args, **kwargs)
 
-        if self.pk:
-            self.rating = self.average_rating
-            super().save(update_fields=['rating'])
+    @classmethod
+    def adjust_rating(cls, pk, sum_delta, count_delta):
+        '''
+        Atomically apply a review change to the stored rating counters.
+
+        The average is recomputed from the new counters within the same
+        UPDATE statement, so no review rows are read.
+
+        Args:
+            pk (int): The primary key of the product.
+            sum_delta (int): Change to apply to the sum of ratings.
+            count_delta (int): Change to apply to the number of ratings.
+        '''
+        if not sum_delta and not count_delta:
+            return
+
+        new_sum = F('rating_sum') + sum_delta
+        new_count = F('rating_count') + count_delta
+
+        cls.objects.filter(pk=pk).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=Round(
+                        Cast(new_sum, FloatField()) / new_count, 1
+                    )
+                ),
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        )
+
+    def _get_image_urls(self, key):
+        '''
+        Return the stored image URLs, building them when the requested
+        URL was not stored, e.g. for products saved before the URLs were
+        stored or while Cloudinary was not configured.
+
+        Args:
+            key (str): The URL needed, e.g. 'list' or 'detail_srcset'.
+        '''
+        if self.image_path and key not in self.image_urls:
+            return build_image_urls(self.image_path, self.cloudinary_version)
+        return self.image_urls
 
     def image(self, view=None):
         '''
         Retrieve the product image URL or return a placeholder if unavailable.
         If the view is 'list', return a thumbnail version of the image.
 
+        URLs are built when the image changes, see save().
+
         Args:
             view (str): The view context (e.g., 'list' or 'detail').
 
         Returns:
             str: The URL of the product image or a static placeholder.
         '''
-        try:
-            # Access the CLOUD_NAME from settings.CLOUDINARY_STORAGE
-            cloud_name = settings.CLOUDINARY_STORAGE['CLOUD_NAME']
+        return self.image_url(view) or placeholder_image()
 
-            if self.image_path:
-                public_id = (
-                    self.image_path.public_id
-                    if hasattr(self.image_path, 'public_id')
-                    else str(self.image_path)
-                )
+    def image_url(self, view=None):
+        '''
+        Retrieve the product image URL, without placeholder.
 
-                version = self.cloudinary_version or None
+        Args:
+            view (str): The view context (e.g., 'list' or 'detail').
 
-                # Use the 'Thumbnail' transformation for the list view
-                if view == 'list':
-                    transformation = "t_Thumbnail/"
-                else:
-                    transformation = ""
+        Returns:
+            str: The URL of the product image, empty if it has none.
+        '''
+        key = 'list' if view == 'list' else 'detail'
+        return self._get_image_urls(key).get(key, '')
 
-                url = (
-                    f"https://res.cloudinary.com/{cloud_name}/image/upload/"
-                    f"{transformation}v{version}/{public_id}"
-                )
-                return url
-        except Exception:
-            return static('images/product-holder.webp')
+    def image_srcset(self, view=None):
+        '''
+        Retrieve the responsive srcset of the product image.
 
-        return static('images/product-holder.webp')
+        Args:
+            view (str): The view context (e.g., 'list' or 'detail').
+
+        Returns:
+            str: The srcset value, empty if the product has no image.
+        '''
+        key = 'list_srcset' if view == 'list' else 'detail_srcset'
+        return self._get_image_urls(key).get(key, '')
 
     def get_buy_url(self):
         '''
@@ -239,13 +358,14 @@ class Product(models.Model):
     @property
     def average_rating(self):
         '''
-        Calculate and return the average product rating.
+        Return the average product rating from the stored counters.
 
         Returns:
             float: Rounded average rating or 0.0 if no ratings exist.
         '''
-        avg = self.reviews.aggregate(average=Avg('rating'))['average']
-        return round(avg, 1) if avg else 0.0
+        if not self.rating_count:
+            return 0.0
+        return round(self.rating_sum / self.rating_count, 1)
 
 
 class ProductVariant(models.Model):
@@ -315,6 +435,8 @@ class ProductReview(models.Model):
         comment (str): A short review comment.
         silenced (bool): Whether the review is silenced.
         created_at (datetime): Timestamp for when the review was created.
+        updated_at (datetime): Timestamp for when the review was last
+            updated.
     '''
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name='reviews',
@@ -327,7 +449,8 @@ class ProductReview(models.Model):
     )
 
     rating = models.IntegerField(
-        help_text='Integer rating 0-5', blank=False, null=False
+        help_text='Integer rating 0-5', blank=False, null=False,
+        validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
 
     comment = models.CharField(
@@ -337,9 +460,233 @@ class ProductReview(models.Model):
 
     silenced = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['product', '-created_at'],
+                name='review_product_recent_idx'
+            ),
+        ]
 
     def __str__(self):
         return (
             f'Review of {self.product.name} by '
             f'{self.user if self.user else 'Anonymous'}: {self.rating}'
         )
+
+
+class ProductRatingHistogram(models.Model):
+    '''
+    Model holding the number of reviews per rating value for a product.
+
+    Kept up to date by the review signals so product pages can show the
+    rating summary without aggregating over all reviews.
+
+    Attributes:
+        product (Product): The product the histogram belongs to.
+        rating_0 ... rating_5 (int): Number of reviews with each rating.
+    '''
+    RATINGS = range(6)
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='rating_histogram',
+        primary_key=True
+    )
+
+    rating_0 = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Rating histogram of {self.product_id}'
+
+    def as_dict(self):
+        '''
+        Return the histogram as a mapping of rating to review count.
+
+        Returns:
+            dict: Review counts keyed by rating, from 0 to 5.
+        '''
+        return {
+            rating: getattr(self, f'rating_{rating}')
+            for rating in self.RATINGS
+        }
+
+    @property
+    def total(self):
+        '''
+        Return the total number of reviews counted in the histogram.
+        '''
+        return sum(self.as_dict().values())
+
+    @classmethod
+    def adjust(cls, product_id, rating, delta):
+        '''
+        Atomically add delta to the counter of the given rating.
+
+        Args:
+            product_id (int): The primary key of the product.
+            rating (int): The rating bucket to update.
+            delta (int): The amount to add to the bucket.
+        '''
+        if rating not in cls.RATINGS or not delta:
+            return
+
+        field = f'rating_{rating}'
+        cls.objects.filter(product_id=product_id).update(
+            **{field: F(field) + delta}
+        )
+
+    @classmethod
+    def rebuild(cls, product_id):
+        '''
+        Recount the histogram of a product from its reviews.
+
+        Args:
+            product_id (int): The primary key of the product.
+
+        Returns:
+            ProductRatingHistogram: The refreshed histogram.
+        '''
+        counts = (
+            ProductReview.objects.filter(product_id=product_id)
+            .values('rating')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        defaults = {f'rating_{rating}': 0 for rating in cls.RATINGS}
+        for entry in counts:
+            if entry['rating'] in cls.RATINGS:
+                defaults[f'rating_{entry["rating"]}'] = entry['count']
+
+        histogram, _ = cls.objects.update_or_create(
+            product_id=product_id, defaults=defaults
+        )
+        return histogram
+
+
+class RelatedProduct(models.Model):
+    '''
+    Model representing a product frequently bought together with
+    another, shown on the product page.
+
+    Rows are precomputed from the order history by the
+    build_related_products command, so product pages never aggregate
+    order line items.
+
+    Attributes:
+        product (Product): The product the recommendation is shown for.
+        related (Product): The recommended product.
+        orders (int): Number of orders including both products.
+        rank (int): Position of the recommendation, starting at 1.
+        built_at (datetime): Timestamp for when the row was computed.
+    '''
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='related_products'
+    )
+    related = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='recommended_with'
+    )
+    orders = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    built_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'related'],
+                name='related_product_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.related_id} for {self.product_id} (#{self.rank})'
+
+
+class ProductImageJob(models.Model):
+    '''
+    Model representing a product image waiting to be processed by the
+    image worker (the process_image_jobs management command).
+
+    The uploaded file is staged in the database so the worker does not
+    need to share a filesystem with the web process; it is cleared once
+    the job finishes.
+
+    Attributes:
+        product (Product): The product the image belongs to.
+        file_name (str): The name of the uploaded file.
+        data (bytes): The staged file content.
+        status (str): The processing status of the job.
+        progress (int): The processing progress, in percent.
+        error (str): The error message of a failed job.
+        attempts (int): Number of times processing was started.
+        created_by (User): The user who uploaded the image.
+        created_at (datetime): Timestamp for when the job was created.
+        updated_at (datetime): Timestamp for when the job was last
+            updated.
+    '''
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='image_jobs'
+    )
+    file_name = models.CharField(max_length=255)
+    data = models.BinaryField(editable=False)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='image_job_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Image job {self.pk} for {self.product_id} ({self.status})'
+
+    @property
+    def finished(self):
+        '''
+        Return whether the job reached a final status.
+        '''
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+from operator import itemgetter
+
+# Django imports
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef
+
+# Internal imports
+from checkout.models import OrderLineItem
+from .cache import bump_catalog_version
+from .models import Product, ProductVariant, RelatedProduct
+
+
+def count_co_purchases(since=None):
+    '''
+    Count, for every pair of products, the orders including both.
+
+    Pairs are counted by the database with one grouped self-join of the
+    order line items, so only the non-zero cells of the product
+    co-occurrence matrix are returned. Cancelled orders are ignored.
+
+    Args:
+        since (datetime): Only count orders placed from this time.
+
+    Returns:
+        QuerySet: (product, related, orders) tuples, ordered by product.
+    '''
+    items = OrderLineItem.objects.exclude(order__status='cancelled')
+    if since is not None:
+        items = items.filter(order__date__gte=since)
+
+    return items.exclude(
+        product=F('order__lineitems__product')
+    ).values(
+        'product', related=F('order__lineitems__product')
+    ).annotate(
+        orders=Count('order', distinct=True)
+    ).order_by('product').values_list('product', 'related', 'orders')
+
+
+def build_related_products(top_k=8, min_orders=2, since=None):
+    '''
+    Replace the stored recommendations with the products most often
+    bought together with each product.
+
+    Args:
+        top_k (int): Number of recommendations kept per product.
+        min_orders (int): Number of orders a pair must appear in to be
+            recommended.
+        since (datetime): Only count orders placed from this time.
+
+    Returns:
+        int: The number of recommendations stored.
+    '''
+    rows = []
+    pairs = count_co_purchases(since).iterator(chunk_size=10000)
+    for product_id, group in itertools.groupby(pairs, key=itemgetter(0)):
+        best = heapq.nlargest(
+            top_k,
+            (pair for pair in group if pair[2] >= min_orders),
+            key=lambda pair: (pair[2], -pair[1])
+        )
+        rows.extend(
+            RelatedProduct(
+                product_id=product_id,
+                related_id=related_id,
+                orders=orders,
+                rank=rank
+            )
+            for rank, (_, related_id, orders) in enumerate(best, 1)
+        )
+
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        RelatedProduct.objects.bulk_create(rows, batch_size=1000)
+    bump_catalog_version()
+    return len(rows)
+
+
+def _available_products():
+    '''
+    Return the products that can be bought.
+
+    Returns:
+        QuerySet: Active products with at least one active variant.
+    '''
+    return Product.objects.filter(active=True).filter(
+        Exists(ProductVariant.objects.filter(
+            product=OuterRef('pk'), active=True
+        ))
+    )
+
+
+def get_related_products(product, limit=4):
+    '''
+    Return the products to recommend on a product page.
+
+    Precomputed recommendations come first. Products without enough of
+    them, such as new products, are completed with the best-rated
+    products of their category. Only products that can be bought are
+    returned.
+
+    Args:
+        product (Product): The product shown.
+        limit (int): Maximum number of products returned.
+
+    Returns:
+        list: The recommended products.
+    '''
+    available = _available_products()
+    related = list(
+        available.filter(
+            recommended_with__product=product
+        ).order_by('recommended_with__rank')[:limit]
+    )
+    if len(related) < limit:
+        related.extend(
+            available.filter(category_id=product.category_id).exclude(
+                pk__in=[product.pk, *(item.pk for item in related)]
+            ).order_by('-rating', '-rating_count', 'name')[
+                :limit - len(related)
+            ]
+        )
+    return related
+
+
+def get_top_sellers(limit=4):
+    '''
+    Return the products sold the most over the best-seller window.
+
+    Reads the stored scores through the best-selling index, so no order
+    line items are aggregated.
+
+    Args:
+        limit (int): Maximum number of products returned.
+
+    Returns:
+        list: The best-selling products that can be bought.
+    '''
+    return list(
+        _available_products().filter(
+            units_sold__gt=0
+        ).order_by('-units_sold', 'name')[:limit]
+    )
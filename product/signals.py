@@ -0,0 +1,184 @@
+# Django imports
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+# Internal imports
+from .cache import (
+    bump_page_version,
+    bump_catalog_version,
+    bump_category_version
+)
+from .models import (
+    Category,
+    Product,
+    ProductVariant,
+    ProductReview,
+    ProductRatingHistogram
+)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_slug(sender, instance, **kwargs):
+    '''
+    Signal to store the slug of a product before it is updated, so the
+    cached pages of a renamed product can be purged as well.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved.
+        **kwargs: Additional keyword arguments.
+    '''
+    instance._previous_slug = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_slug = Product.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def purge_product_page(sender, instance, **kwargs):
+    '''
+    Signal to purge the cached pages of a product when it is saved or
+    deleted.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    bump_page_version(instance.slug)
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug and previous_slug != instance.slug:
+        bump_page_version(previous_slug)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def purge_parent_product_page(sender, instance, **kwargs):
+    '''
+    Signal to purge the cached pages of a product when one of its
+    variants or reviews is saved or deleted.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    if sender.product.is_cached(instance):
+        slug = instance.product.slug
+    else:
+        slug = Product.objects.filter(
+            pk=instance.product_id
+        ).values_list('slug', flat=True).first()
+    bump_page_version(slug)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_catalog_pages(sender, instance, **kwargs):
+    '''
+    Signal to purge every cached product page when a category changes,
+    as category names are shown on all product pages.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_category_registry(sender, instance, **kwargs):
+    '''
+    Signal to reload the category registry used by the product views
+    when a category is saved or deleted.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved or deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    bump_category_version()
+
+
+@receiver(post_save, sender=Product)
+def create_rating_histogram(sender, instance, created, **kwargs):
+    '''
+    Signal to create an empty rating histogram for new products.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved.
+        created (bool): Whether this is a new instance.
+        **kwargs: Additional keyword arguments.
+    '''
+    if created:
+        ProductRatingHistogram.objects.get_or_create(product=instance)
+
+
+@receiver(pre_save, sender=ProductReview)
+def remember_previous_rating(sender, instance, **kwargs):
+    '''
+    Signal to store the stored rating of a review before it is updated,
+    so the post_save handler can apply only the difference.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved.
+        **kwargs: Additional keyword arguments.
+    '''
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = ProductReview.objects.filter(
+            pk=instance.pk
+        ).values_list('rating', flat=True).first()
+
+
+@receiver(post_save, sender=ProductReview)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    '''
+    Signal to update the product rating counters and histogram when a
+    review is created or its rating is changed.
+
+    Silencing a review only hides its comment, so it keeps counting
+    towards the product rating.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being saved.
+        created (bool): Whether this is a new instance.
+        **kwargs: Additional keyword arguments.
+    '''
+    previous_rating = getattr(instance, '_previous_rating', None)
+
+    if created or previous_rating is None:
+        Product.adjust_rating(instance.product_id, instance.rating, 1)
+        ProductRatingHistogram.adjust(instance.product_id, instance.rating, 1)
+    elif previous_rating != instance.rating:
+        Product.adjust_rating(
+            instance.product_id, instance.rating - previous_rating, 0
+        )
+        ProductRatingHistogram.adjust(
+            instance.product_id, previous_rating, -1
+        )
+        ProductRatingHistogram.adjust(instance.product_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=ProductReview)
+def update_rating_on_delete(sender, instance, **kwargs):
+    '''
+    Signal to update the product rating counters and histogram when a
+    review is deleted.
+
+    Args:
+        sender: The model class that sent the signal.
+        instance: The actual instance being deleted.
+        **kwargs: Additional keyword arguments.
+    '''
+    Product.adjust_rating(instance.product_id, -instance.rating, -1)
+    ProductRatingHistogram.adjust(instance.product_id, instance.rating, -1)
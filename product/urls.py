@@ -5,9 +5,13 @@ from django.urls import path
 from .views import (
     ProductListView,
     ProductDetailView,
+    ProductReviewListView,
+    ProductImageView,
+    ProductImageJobView,
     ProductDeactivateView,
     ReviewSilenceToggler,
     VariantDeactivateView,
+    VariantBulkUpdateView,
     SaveSelector,
     ProductSaveView,
     ProductCreateView
@@ -44,6 +48,12 @@ urlpatterns = [
         name='variant_deactivate'
     ),
 
+    path(
+        'variant/bulk-update/',
+        VariantBulkUpdateView.as_view(),
+        name='variant_bulk_update'
+    ),
+
     path(
         'reviews/toggle-silence/<int:review_id>/',
         ReviewSilenceToggler.as_view(),
@@ -56,6 +66,24 @@ urlpatterns = [
         name='save_selector'
     ),
 
+    path(
+        'images/<slug:digest>/<int:width>/',
+        ProductImageView.as_view(),
+        name='product_image'
+    ),
+
+    path(
+        'image-jobs/<int:pk>/',
+        ProductImageJobView.as_view(),
+        name='product_image_job'
+    ),
+
+    path(
+        '<slug:slug>/reviews/',
+        ProductReviewListView.as_view(),
+        name='product_reviews'
+    ),
+
     path(
         '<slug:slug>/',
         ProductDetailView.as_view(),
@@ -1,5 +1,6 @@
 import json
 import os
+import re
 
 # Django imports
 from django.views.generic import (
@@ -23,7 +24,6 @@ from django.db.models import (
     Subquery,
     OuterRef,
     Q,
-    Count,
     Avg,
     Exists
 )
@@ -32,22 +32,32 @@ from django.contrib.auth.mixins import (
     UserPassesTestMixin
 )
 from django.http import (
+    FileResponse,
     JsonResponse,
     Http404
 )
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from django.utils.decorators import method_decorator
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.urls import reverse
-
-# Third-party imports
-from cloudinary.uploader import (
-    upload,
-    destroy
-)
+from django.template.loader import render_to_string
 
 # Internal imports
+from .cache import (
+    AnonymousPageCacheMixin,
+    catalog_etag,
+    catalog_last_modified,
+    get_categories,
+    get_category_ids,
+    product_detail_etag,
+    product_detail_last_modified
+)
+from .images import LocalImageBackend
+from .jobs import enqueue_image_upload, image_job_status
+from .catalog import apply_variant_updates
+from .recommendations import get_related_products
 from .forms import (
     ProductEditForm,
     ProductVariantForm,
@@ -57,17 +67,27 @@ from .models import (
     Product,
     ProductVariant,
     Category,
-    ProductReview
+    ProductReview,
+    ProductRatingHistogram,
+    ProductImageJob
 )
 
 
+@method_decorator(
+    condition(
+        etag_func=catalog_etag,
+        last_modified_func=catalog_last_modified
+    ),
+    name='dispatch'
+)
 class ProductListView(ListView):
     '''
     Display a list of products with filtering, sorting, and search options.
 
     Supports filters by category, price range, ratings, and stock status.
-    Provides sorting options for price, name, and ratings.
+    Provides sorting options for price, name, ratings, and recent sales.
     Admin users see inactive products and variants as well.
+    Unchanged pages are answered with 304 Not Modified.
     '''
     model = Product
     template_name = 'product/product_list.html'
@@ -85,6 +105,7 @@ class ProductListView(ListView):
         selected_categories = [
             c for c in self.request.GET.getlist('category[]') if c
         ]
+        category_ids = get_category_ids(selected_categories)
         price_min = self.request.GET.get('price_min') or None
         price_max = self.request.GET.get('price_max') or None
         min_rating = self.request.GET.get('rating') or None
@@ -138,7 +159,7 @@ class ProductListView(ListView):
         if not show_out_of_stock:
             queryset = queryset.filter(default_variant_stock__gt=0)
         if selected_categories:
-            queryset = queryset.filter(category__slug__in=selected_categories)
+            queryset = queryset.filter(category_id__in=category_ids)
         if price_min:
             queryset = queryset.filter(variants__price__gte=price_min)
         if price_max:
@@ -167,7 +188,7 @@ class ProductListView(ListView):
 
             if selected_categories:
                 queryset = queryset.filter(
-                    product__category__slug__in=selected_categories
+                    product__category_id__in=category_ids
                 )
             if price_min:
                 queryset = queryset.filter(price__gte=price_min)
@@ -196,6 +217,8 @@ class ProductListView(ListView):
             queryset = queryset.order_by('name')
         elif sort_by == 'name_desc':
             queryset = queryset.order_by('-name')
+        elif sort_by == 'best_selling':
+            queryset = queryset.order_by('-units_sold', 'name')
 
         return queryset.distinct()
 
@@ -245,6 +268,7 @@ class ProductListView(ListView):
                     'size_active': variant.active,
                     'stock_by_size': stock_by_size,
                     'image': product.image(view='list'),
+                    'image_srcset': product.image_srcset(view='list'),
                 })
         else:
             for product in self.object_list:
@@ -273,16 +297,14 @@ class ProductListView(ListView):
                     'stock_by_size': stock_by_size,
                     'buy_url': product.get_buy_url,
                     'image': product.image(view='list'),
+                    'image_srcset': product.image_srcset(view='list'),
                 })
 
-        category_items = [
-            {'id': category.id, 'name': category.name, 'slug': category.slug}
-            for category in Category.objects.all().order_by('slug')
-        ]
+        category_items = get_categories()
 
         context.update({
             'products_with_context': products_with_context,
-            'category': Category.objects.values('slug', 'name'),
+            'category': category_items,
             'category_items': category_items,
             'selected_categories': self.request.GET.getlist('category[]'),
             'max_review': range(5),
@@ -293,6 +315,7 @@ class ProductListView(ListView):
                 'name_desc': 'Name: Z to A',
                 'rating_asc': 'Rating: Low to High',
                 'rating_desc': 'Rating: High to Low',
+                'best_selling': 'Best Selling',
             },
             'show_out_of_stock': self.request.GET.get(
                 'show_out_of_stock'
@@ -305,14 +328,65 @@ class ProductListView(ListView):
         return context
 
 
-class ProductDetailView(DetailView):
+class ReviewPageMixin:
+    '''
+    Provide paginated access to the reviews shown on a product page.
+
+    Pages are fetched with one extra row to detect if more reviews exist,
+    so no COUNT query is needed.
+    '''
+    reviews_per_page = 10
+
+    def get_review_page(self, product, is_admin, page=1, rating=None):
+        '''
+        Retrieve one page of reviews with comments, newest first.
+
+        Args:
+            product (Product): The reviewed product.
+            is_admin (bool): Whether silenced reviews should be included.
+            page (int): The 1-based page number.
+            rating (int): Optional rating to filter the reviews by.
+
+        Returns:
+            tuple: The reviews on the page and whether more pages exist.
+        '''
+        reviews = (
+            product.reviews.exclude(comment='')
+            .select_related('user')
+            .order_by('-created_at', '-id')
+        )
+        if not is_admin:
+            reviews = reviews.filter(silenced=False)
+        if rating is not None:
+            reviews = reviews.filter(rating=rating)
+
+        offset = (page - 1) * self.reviews_per_page
+        page_reviews = list(
+            reviews[offset:offset + self.reviews_per_page + 1]
+        )
+        has_next = len(page_reviews) > self.reviews_per_page
+        return page_reviews[:self.reviews_per_page], has_next
+
+
+@method_decorator(
+    condition(
+        etag_func=product_detail_etag,
+        last_modified_func=product_detail_last_modified
+    ),
+    name='dispatch'
+)
+class ProductDetailView(AnonymousPageCacheMixin, ReviewPageMixin, DetailView):
     '''
     Display detailed information about a single product, including
     variants and reviews. Handle review creation via POST.
 
     For non-admin users, ensure the product and its variants are active.
+    Pages for anonymous visitors can be cached, see
+    AnonymousPageCacheMixin, and unchanged pages are answered with
+    304 Not Modified.
     '''
     model = Product
+    queryset = Product.objects.select_related('category', 'rating_histogram')
     template_name = 'product/product_detail.html'
     context_object_name = 'product'
 
@@ -351,12 +425,26 @@ class ProductDetailView(DetailView):
             )
             if not fallback_variant:
                 if is_admin:
-                    return super().get(request, *args, **kwargs)
+                    return self._render_product(product)
                 raise Http404('This product is no longer available.')
 
             return self._redirect_with_size(request, fallback_variant.size)
 
-        return super().get(request, *args, **kwargs)
+        return self._render_product(product)
+
+    def _render_product(self, product):
+        '''
+        Render the detail page for an already retrieved product.
+
+        Args:
+            product: The product to render.
+
+        Returns:
+            HttpResponse: The rendered product page.
+        '''
+        self.object = product
+        context = self.get_context_data(object=product)
+        return self.render_to_response(context)
 
     def _redirect_with_size(self, request, size):
         '''
@@ -387,8 +475,6 @@ class ProductDetailView(DetailView):
                 request.user if request.user.is_authenticated else None
             )
             review.save()
-            self.object.rating = self.object.average_rating
-            self.object.save()
             return JsonResponse({
                 'success': True,
                 'redirect_url': self.object.get_absolute_url()
@@ -453,31 +539,19 @@ class ProductDetailView(DetailView):
             if is_admin else None
         )
 
-        rating_summary = (
-            product.reviews.values('rating')
-            .annotate(count=Count('rating'))
-            .order_by('rating')
-        )
-        total_reviews = product.reviews.count()
-        rating_summary_dict = {i: 0 for i in range(6)}
-        for entry in rating_summary:
-            rating_summary_dict[entry['rating']] = entry['count']
-
-        visible_reviews = (
-            product.reviews.filter(~Q(comment=''))
-            if is_admin else
-            product.reviews.filter(silenced=False)
-            .exclude(comment='')
-            .order_by('-created_at')
+        try:
+            histogram = product.rating_histogram
+        except ProductRatingHistogram.DoesNotExist:
+            histogram = ProductRatingHistogram.rebuild(product.pk)
+
+        visible_reviews, has_more_reviews = self.get_review_page(
+            product, is_admin
         )
 
         review_form = ProductReviewForm()
 
         selected_category = product.category.id
-        category_items = [
-            {'id': category.id, 'name': category.name}
-            for category in Category.objects.all().order_by('slug')
-        ]
+        category_items = get_categories()
 
         meta_description = (
             f'Buy {product.name} in {product.category.name} category. '
@@ -508,17 +582,172 @@ class ProductDetailView(DetailView):
             'product_form': product_form,
             'variant_form': variant_form,
             'reviews': visible_reviews,
+            'has_more_reviews': has_more_reviews,
             'review_form': review_form,
-            'rating_summary': rating_summary_dict,
-            'total_reviews': total_reviews,
+            'rating_summary': histogram.as_dict(),
+            'total_reviews': histogram.total,
             'category_items': category_items,
             'meta_description': meta_description,
             'meta_keywords': meta_keywords,
             'image': product.image(),
+            'image_srcset': product.image_srcset(),
+            'related_products': [
+                {
+                    'product': related,
+                    'image': related.image('list'),
+                    'image_srcset': related.image_srcset('list'),
+                }
+                for related in get_related_products(product)
+            ],
         })
         return context
 
 
+class ProductReviewListView(ReviewPageMixin, View):
+    '''
+    Return a page of product reviews as rendered HTML for lazy loading.
+
+    Supports filtering by rating. Always returns a JSON response.
+    '''
+    def get(self, request, slug):
+        '''
+        Handle GET requests for a page of reviews.
+
+        Args:
+            request: The incoming HTTP request.
+            slug (str): The slug of the reviewed product.
+
+        Returns:
+            JsonResponse: The rendered reviews and pagination details.
+        '''
+        is_admin = (
+            request.user.is_authenticated and
+            (request.user.is_superuser or request.user.is_staff)
+        )
+
+        try:
+            product = Product.objects.get(slug=slug)
+        except Product.DoesNotExist:
+            product = None
+
+        if not product or (not is_admin and not product.active):
+            return JsonResponse({
+                'success': False, 'error': 'Product not found'
+            }, status=404)
+
+        try:
+            page = max(int(request.GET.get('page') or 1), 1)
+            rating = request.GET.get('rating') or None
+            if rating is not None:
+                rating = int(rating)
+        except ValueError:
+            return JsonResponse({
+                'success': False, 'error': 'Invalid page or rating.'
+            }, status=400)
+
+        reviews, has_next = self.get_review_page(
+            product, is_admin, page, rating
+        )
+        html = ''.join(
+            render_to_string(
+                'product/includes/review_item.html',
+                {'review': review, 'is_admin': is_admin},
+                request=request
+            )
+            for review in reviews
+        )
+
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'has_next': has_next,
+            'next_page': page + 1,
+        })
+
+
+class ProductImageView(View):
+    '''
+    Serve an image rendition generated by the local image backend.
+
+    Renditions never change once written, so they are sent with
+    far-future cache headers. AVIF is preferred when the browser
+    accepts it and it was generated, WebP otherwise.
+    '''
+    def get(self, request, digest, width):
+        '''
+        Handle GET requests for an image rendition.
+
+        Args:
+            request: The incoming HTTP request.
+            digest (str): The content hash of the original image.
+            width (int): The width of the rendition.
+
+        Returns:
+            FileResponse: The image file.
+        '''
+        if (
+            width not in LocalImageBackend.widths or
+            not re.fullmatch(r'[0-9a-f]{32}', digest)
+        ):
+            raise Http404('Image not found')
+
+        directory = LocalImageBackend.directory(digest)
+        accept = request.headers.get('Accept', '')
+        for image_format, extension in (('AVIF', 'avif'), ('WEBP', 'webp')):
+            path = os.path.join(directory, f'{width}.{extension}')
+            if extension == 'avif' and 'image/avif' not in accept:
+                continue
+            if os.path.isfile(path):
+                response = FileResponse(
+                    open(path, 'rb'), content_type=f'image/{extension}'
+                )
+                response['Cache-Control'] = (
+                    'public, max-age=31536000, immutable'
+                )
+                response['Vary'] = 'Accept'
+                return response
+
+        raise Http404('Image not found')
+
+
+class ProductImageJobView(LoginRequiredMixin, UserPassesTestMixin, View):
+    '''
+    Report the progress of a queued product image upload. Admin-only.
+    '''
+    def test_func(self):
+        '''
+        Check if the user has the necessary permissions.
+
+        Returns:
+            bool: True if the user is superuser or staff.
+        '''
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+    def get(self, request, pk):
+        '''
+        Handle GET requests for the status of an image job.
+
+        Args:
+            request: The incoming HTTP request.
+            pk (int): The primary key of the image job.
+
+        Returns:
+            JsonResponse: The status and progress of the job.
+        '''
+        try:
+            job = ProductImageJob.objects.select_related('product').defer(
+                'data'
+            ).get(pk=pk)
+        except ProductImageJob.DoesNotExist:
+            return JsonResponse({
+                'success': False, 'error': 'Image job not found.'
+            }, status=404)
+
+        return JsonResponse({
+            'success': True, **image_job_status(job)
+        })
+
+
 class ProductDeactivateView(LoginRequiredMixin, UserPassesTestMixin, View):
     '''
     Toggle a product's active state. Admin-only.
@@ -597,6 +826,60 @@ class VariantDeactivateView(LoginRequiredMixin, UserPassesTestMixin, View):
             }, status=404)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class VariantBulkUpdateView(LoginRequiredMixin, UserPassesTestMixin, View):
+    '''
+    Apply a batch of stock and price updates to variants. Admin-only.
+
+    Expects a JSON body with an 'updates' list, each row identifying a
+    variant by 'id' or by 'product' slug and 'size', with any of
+    'stock', 'stock_delta', 'price' and 'active'. The batch is applied
+    in one transaction only if every row is valid. Always returns a JSON
+    response with a result per row.
+    '''
+    def test_func(self):
+        '''
+        Check if the user has the necessary permissions.
+
+        Returns:
+            bool: True if the user is superuser or staff.
+        '''
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+    def post(self, request):
+        '''
+        Handle POST requests with a batch of variant updates.
+
+        Args:
+            request: The incoming HTTP request.
+
+        Returns:
+            JsonResponse: The per-row results.
+        '''
+        try:
+            updates = json.loads(request.body).get('updates')
+            applied, results = apply_variant_updates(updates)
+        except (json.JSONDecodeError, AttributeError):
+            return JsonResponse({
+                'success': False, 'error': 'Invalid JSON payload.'
+            }, status=400)
+        except ValidationError as e:
+            return JsonResponse({
+                'success': False, 'error': e.messages[0]
+            }, status=400)
+
+        if not applied:
+            return JsonResponse({
+                'success': False,
+                'error': 'No updates were applied, some rows are invalid.',
+                'results': results
+            }, status=400)
+
+        return JsonResponse({
+            'success': True, 'updated': len(results), 'results': results
+        })
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class SaveSelector(LoginRequiredMixin, UserPassesTestMixin, View):
     '''
@@ -869,29 +1152,25 @@ class ProductSaveView(LoginRequiredMixin, UserPassesTestMixin, View):
                 'errors': product_form.errors.get_json_data()
             }, status=400)
 
+        image_job = None
         try:
-            product_form.save()
+            # An invalid image rolls the product changes back
+            with transaction.atomic():
+                product_form.save()
+                if 'image' in request.FILES:
+                    image_job = enqueue_image_upload(
+                        product, request.FILES['image'], request.user
+                    )
         except IntegrityError as e:
             if 'unique constraint' in str(e).lower():
                 return JsonResponse({
                     'success': False,
                     'error': 'Duplicate product name or slug detected.'
                 }, status=400)
-
-        if 'image' in request.FILES:
-            image_file = request.FILES['image']
-            if product.image_path:
-                destroy(product.image_path.public_id)
-            new_file_name = f'products/{product.slug}'
-            upload_result = upload(
-                image_file,
-                public_id=new_file_name,
-                overwrite=True,
-                resource_type='image'
-            )
-            product.image_path = upload_result['public_id']
-            product.cloudinary_version = upload_result.get('version')
-            product.save()
+        except ValidationError as e:
+            return JsonResponse({
+                'success': False, 'error': e.messages[0]
+            }, status=400)
 
         if variant_id:
             try:
@@ -919,10 +1198,13 @@ class ProductSaveView(LoginRequiredMixin, UserPassesTestMixin, View):
                         'error': 'Duplicate size name detected.'
                     }, status=400)
 
-        return JsonResponse({
+        response = {
             'success': True,
             'redirect_url': product.get_absolute_url()
-        })
+        }
+        if image_job:
+            response['image_job'] = image_job_status(image_job)
+        return JsonResponse(response)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -968,8 +1250,15 @@ class ProductCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
             form = self.form_class(product_data)
 
             if form.is_valid():
+                image_job = None
                 try:
-                    product = form.save()
+                    # An invalid image rolls the new product back
+                    with transaction.atomic():
+                        product = form.save()
+                        if 'image' in request.FILES:
+                            image_job = enqueue_image_upload(
+                                product, request.FILES['image'], request.user
+                            )
                 except IntegrityError as e:
                     if 'unique constraint' in str(e).lower():
                         return JsonResponse({
@@ -977,14 +1266,22 @@ class ProductCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
                             'error': 'Duplicate product name or slug detected.'
                         }, status=400)
                     raise e
+                except ValidationError as e:
+                    return JsonResponse({
+                        'success': False, 'error': e.messages[0]
+                    }, status=400)
 
-                return JsonResponse({
+                response = {
                     'success': True,
                     'product_id': product.id,
                     'redirect_url': reverse('product_detail', kwargs={
                         'slug': product.slug
                     }),
-                })
+                }
+                if image_job:
+                    response['image_job'] = image_job_status(image_job)
+
+                return JsonResponse(response)
 
             return JsonResponse({
                 'success': False,
@@ -1018,10 +1315,7 @@ class ProductCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
         '''
         context = super().get_context_data(**kwargs)
         context['product_form'] = self.get_form()
-        context['category_items'] = [
-            {'id': category.id, 'name': category.name}
-            for category in Category.objects.all().order_by('slug')
-        ]
+        context['category_items'] = get_categories()
         context['is_admin'] = (
             self.request.user.is_authenticated and
             (self.request.user.is_superuser or self.request.user.is_staff)
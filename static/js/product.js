@@ -9,6 +9,7 @@ function previewImage(input, imageId) {
         reader.onload = function (e) {
             const imageElement = document.getElementById(imageId);
             if (imageElement) {
+                imageElement.removeAttribute('srcset');
                 imageElement.src = e.target.result;
             }
         };
@@ -382,51 +383,67 @@ class StarRatingHandler {
 }
 
 /**
- * Filters reviews based on their ratings.
+ * Filters reviews based on their ratings and lazily loads further pages from the server.
  */
 class ReviewFilterHandler {
-    constructor(filterSelector, reviewSelector, noResultsMessageSelector) {
+    constructor(filterSelector, listSelector, loadMoreSelector, noResultsMessageSelector) {
         this.filters = document.querySelectorAll(filterSelector);
-        this.reviews = document.querySelectorAll(reviewSelector);
+        this.list = document.querySelector(listSelector);
+        this.loadMoreButton = document.querySelector(loadMoreSelector);
         this.noResultsMessage = document.querySelector(noResultsMessageSelector);
+        this.filterValue = "all";
+        this.nextPage = 2;
 
-        if (this.filters.length > 0 && this.reviews.length > 0) {
+        if (this.list && this.list.dataset.url) {
             this.init();
         }
     }
 
     /**
-     * Initializes event listeners for the review filters.
+     * Initializes event listeners for the review filters and the load more button.
      */
     init() {
         this.filters.forEach(filter => {
             filter.addEventListener('click', () => {
-                const filterValue = filter.dataset.filter ? parseInt(filter.dataset.filter, 10) : "all";
-                this.filterReviews(filterValue);
+                this.filterValue = filter.dataset.filter ?? "all";
+                this.loadReviews(1, true);
             });
         });
+
+        if (this.loadMoreButton) {
+            this.loadMoreButton.addEventListener('click', () => {
+                this.loadReviews(this.nextPage, false);
+            });
+        }
     }
 
     /**
-     * Filters the reviews based on the selected rating.
-     * @param {number|string} filterValue - The rating value to filter by or 'all' to show all reviews.
+     * Fetches a page of reviews for the selected rating.
+     * @param {number} page - The page number to load.
+     * @param {boolean} replace - Whether to replace the reviews currently shown.
      */
-    filterReviews(filterValue) {
-        let reviewsShown = 0;
+    async loadReviews(page, replace) {
+        const params = new URLSearchParams({ page: page });
+        if (this.filterValue !== "all") {
+            params.set('rating', this.filterValue);
+        }
 
-        this.reviews.forEach(review => {
-            const reviewRating = parseInt(review.getAttribute("data-rating"), 10);
+        const data = await customFetch(`${this.list.dataset.url}?${params.toString()}`);
+        if (!data || !data.success) return;
 
-            if (filterValue === "all" || reviewRating === filterValue) {
-                review.style.display = "block";
-                reviewsShown++;
-            } else {
-                review.style.display = "none";
-            }
-        });
+        if (replace) {
+            this.list.innerHTML = '';
+        }
+        this.list.insertAdjacentHTML('beforeend', data.html);
+        this.nextPage = data.next_page;
+
+        if (this.loadMoreButton) {
+            this.loadMoreButton.classList.toggle('d-none', !data.has_next);
+        }
 
         if (this.noResultsMessage) {
-            this.noResultsMessage.style.display = reviewsShown === 0 ? "block" : "none";
+            const reviewsShown = this.list.querySelectorAll('.review-container').length;
+            this.noResultsMessage.style.display = reviewsShown === 0 && this.filterValue !== "all" ? "block" : "none";
         }
     }
 }
@@ -436,37 +453,38 @@ class ReviewFilterHandler {
  */
 class ReviewSilenceHandler {
     constructor(buttonSelector, reviewContainerSelector) {
-        this.buttons = document.querySelectorAll(buttonSelector);
+        this.buttonSelector = buttonSelector;
         this.reviewContainerSelector = reviewContainerSelector;
 
-        if (this.buttons.length > 0) {
+        if (document.querySelector('#review-items')) {
             this.init();
         }
     }
 
     /**
-     * Initializes event listeners for silence toggle buttons.
+     * Initializes a delegated click listener so lazily loaded reviews are handled too.
      */
     init() {
-        this.buttons.forEach(button => {
-            button.addEventListener('click', async (event) => {
-                event.preventDefault();
-                const url = button.getAttribute('data-url');
-                const reviewId = button.getAttribute('data-review-id');
+        document.addEventListener('click', async (event) => {
+            const button = event.target.closest(this.buttonSelector);
+            if (!button) return;
+
+            event.preventDefault();
+            const url = button.getAttribute('data-url');
+            const reviewId = button.getAttribute('data-review-id');
 
-                if (!url || !reviewId) return;
+            if (!url || !reviewId) return;
 
-                const response = await customFetch(url, { method: 'POST' });
+            const response = await customFetch(url, { method: 'POST' });
 
-                if (response) {
-                    if (response.success) {
-                        showToast('success', `Review ${response.silenced ? 'silenced' : 'unsilenced'} successfully!`);
-                        this.updateReviewState(button, reviewId, response.silenced);
-                    } else {
-                        showToast('error', `Error toggling silence: ${response.error}`);
-                    }
+            if (response) {
+                if (response.success) {
+                    showToast('success', `Review ${response.silenced ? 'silenced' : 'unsilenced'} successfully!`);
+                    this.updateReviewState(button, reviewId, response.silenced);
+                } else {
+                    showToast('error', `Error toggling silence: ${response.error}`);
                 }
-            });
+            }
         });
     }
 
@@ -889,6 +907,7 @@ class ProductSaveHandler {
 
             reader.onload = (e) => {
                 if (this.previewElement) {
+                    this.previewElement.removeAttribute('srcset');
                     this.previewElement.src = e.target.result; // Update the image preview
                 } else {
                     showToast('error', 'Preview element not found.');
@@ -1008,9 +1027,18 @@ class ProductSaveHandler {
             },
             body: formData,
         })
-            .then(data => {
+            .then(async data => {
                 if (data && data.success) {
                     showToast('success', 'Product saved successfully.');
+                    if (data.image_job) {
+                        showToast('info', 'Processing image...');
+                        const job = await this.trackImageJob(data.image_job);
+                        if (job && job.status === 'done') {
+                            showToast('success', 'Image uploaded successfully.');
+                        } else if (job) {
+                            showToast('error', `Image upload failed: ${job.error}`);
+                        }
+                    }
                     if (data.redirect_url) {
                         setTimeout(() => window.location.href = data.redirect_url, 2000);
                     }
@@ -1022,13 +1050,43 @@ class ProductSaveHandler {
                 }
             });
     }
+
+    /**
+     * Polls a queued image upload until the image worker finishes it,
+     * showing its progress under the product image.
+     * @param {Object} job - The image job returned by the save endpoint.
+     * @returns {Promise<Object|null>} The final job status, or null on failure.
+     */
+    async trackImageJob(job) {
+        const progressElement = document.querySelector('.image-upload-progress');
+        const progressBar = progressElement ? progressElement.querySelector('.progress-bar') : null;
+        let status = job;
+
+        if (progressElement) {
+            progressElement.classList.remove('d-none');
+        }
+
+        while (status && !status.finished) {
+            if (progressBar) {
+                progressBar.style.width = `${status.progress}%`;
+                progressElement.setAttribute('aria-valuenow', status.progress);
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            status = await customFetch(status.status_url);
+        }
+
+        if (progressElement) {
+            progressElement.classList.add('d-none');
+        }
+        return status;
+    }
 }
 
 // Initialize handlers on DOM load
 document.addEventListener('DOMContentLoaded', () => {
     const productCardHandler = new ProductCardHandler();
     const starRatingHandler = new StarRatingHandler('#star-rating', '#id_rating');
-    const reviewFilterHandler = new ReviewFilterHandler('.filter', '.review-container', '#no-reviews-message');
+    const reviewFilterHandler = new ReviewFilterHandler('.filter', '#review-items', '#load-more-reviews', '#no-reviews-message');
     const reviewSilenceHandler = new ReviewSilenceHandler('.toggle-silence-btn', '.review-container');
     const productActivationHandler = new ProductActivationHandler('.toggle-product-btn');
     const variantActivationHandler = new ProductActivationHandler('.toggle-variant-btn');
@@ -60,6 +60,59 @@ function handleScreenResize() {
     }
 }
 
+/**
+ * Loads further pages of the order history while scrolling, or on click of the load more button.
+ */
+class OrderHistoryHandler {
+    constructor(listSelector, loadMoreSelector) {
+        this.list = document.querySelector(listSelector);
+        this.loadMoreButton = document.querySelector(loadMoreSelector);
+        this.nextPage = 2;
+        this.loading = false;
+
+        if (this.list && this.list.dataset.url && this.loadMoreButton) {
+            this.init();
+        }
+    }
+
+    /**
+     * Initializes the load more button and loads the next page when it scrolls into view.
+     */
+    init() {
+        this.loadMoreButton.addEventListener('click', () => this.loadOrders());
+
+        if ('IntersectionObserver' in window) {
+            const observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadOrders();
+                }
+            }, { rootMargin: '200px' });
+            observer.observe(this.loadMoreButton);
+        }
+    }
+
+    /**
+     * Fetches the next page of orders and appends it to the list.
+     */
+    async loadOrders() {
+        if (this.loading || this.loadMoreButton.classList.contains('d-none')) return;
+        this.loading = true;
+
+        const params = new URLSearchParams({ page: this.nextPage });
+        const data = await customFetch(`${this.list.dataset.url}?${params.toString()}`);
+        this.loading = false;
+        if (!data || !data.success) return;
+
+        this.list.insertAdjacentHTML('beforeend', data.html);
+        this.nextPage = data.next_page;
+        this.loadMoreButton.classList.toggle('d-none', !data.has_next);
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    window.orderHistoryHandler = new OrderHistoryHandler('#order-items', '#load-more-orders');
+});
+
 /**
  * Initializes the sidebar state and event listeners once the DOM is fully loaded.
  */
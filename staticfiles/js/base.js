@@ -184,12 +184,18 @@ function setupCookieConsent() {
 }
 
 /**
- * Loads deferred images by setting their "src" attribute from "data-src".
+ * Loads deferred images by setting their "src" and "srcset" attributes
+ * from "data-src" and "data-srcset".
  */
 function loadDeferredImages() {
     const deferredImages = document.querySelectorAll('.deferred-image[data-src]');
     deferredImages.forEach(img => {
         const dataSrc = img.getAttribute('data-src');
+        const dataSrcset = img.getAttribute('data-srcset');
+        if (dataSrcset) {
+            img.srcset = dataSrcset;
+            img.removeAttribute('data-srcset');
+        }
         if (dataSrc) {
             img.src = dataSrc; // Set the actual source to the img element
             img.removeAttribute('data-src'); // Clean up the data-src attribute
@@ -0,0 +1,619 @@
+import random
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+# Django imports
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.auth.signals import user_logged_in
+from django.contrib.messages.storage import default_storage
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+# Third-party imports
+import stripe
+
+# Internal imports
+from accounts.middleware import LoginRequiredMiddleware
+from accounts.models import UserProfile
+from cart.models import CartEntry
+from cart.signals import handle_user_login
+from checkout.models import Order, OrderLineItem, generate_order_number
+from product.models import (
+    Category,
+    Product,
+    ProductVariant,
+    ProductReview,
+    ProductRatingHistogram,
+    make_slug
+)
+
+SIZES = ('250g', '500g', '1kg', 'Small', 'Medium', 'Large', 'XL')
+
+SORT_MODES = (
+    'price_asc',
+    'price_desc',
+    'name_asc',
+    'name_desc',
+    'rating_asc',
+    'rating_desc',
+    'best_selling',
+)
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def seed_catalog(categories=5, products=200, variants=3, reviews=10,
+                 users=50, orders=200, seed=0):
+    '''
+    Fill the database with a synthetic catalog using bulk inserts.
+
+    Relies on bulk_create setting primary keys, which PostgreSQL and
+    SQLite both support.
+
+    Rating counters and histograms are computed while seeding, as bulk
+    inserts bypass the signals that normally maintain them.
+
+    Args:
+        categories (int): Number of categories.
+        products (int): Number of products.
+        variants (int): Number of sizes per product, at most len(SIZES).
+        reviews (int): Number of reviews per product.
+        users (int): Number of customers.
+        orders (int): Number of orders, spread over the customers.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict: The staff user and a customer with a cart and orders.
+    '''
+    rng = random.Random(seed)
+
+    category_ids = [
+        category.pk for category in Category.objects.bulk_create([
+            Category(name=f'Bench {i}', slug=make_slug(f'Bench {i}'))
+            for i in range(categories)
+        ])
+    ]
+
+    customers = User.objects.bulk_create([
+        User(
+            username=f'bench_user_{i}',
+            email=f'bench_user_{i}@example.com',
+            password='!'
+        )
+        for i in range(users)
+    ])
+    UserProfile.objects.bulk_create([
+        UserProfile(user=customer, default_full_name=customer.username)
+        for customer in customers
+    ])
+
+    product_objects = Product.objects.bulk_create([
+        Product(
+            name=f'Bench Product {i}',
+            slug=make_slug(f'Bench Product {i}'),
+            category_id=rng.choice(category_ids),
+            description='Synthetic product for benchmarks.',
+        )
+        for i in range(products)
+    ])
+
+    variant_objects = []
+    for product in product_objects:
+        for size in SIZES[:variants]:
+            variant_objects.append(ProductVariant(
+                product=product,
+                size=size,
+                price=Decimal(rng.randint(300, 6000)) / 100,
+                stock=rng.choice((0, 5, 20, 100)),
+            ))
+    ProductVariant.objects.bulk_create(variant_objects, batch_size=1000)
+
+    review_objects, histograms = [], []
+    for product in product_objects:
+        counts = [0] * 6
+        for _ in range(reviews):
+            rating = rng.randint(0, 5)
+            counts[rating] += 1
+            review_objects.append(ProductReview(
+                product=product,
+                user=rng.choice(customers) if customers else None,
+                rating=rating,
+                comment=rng.choice(('', 'Great coffee.', 'Not for me.')),
+            ))
+        product.rating_sum = sum(r * n for r, n in enumerate(counts))
+        product.rating_count = reviews
+        product.rating = (
+            round(product.rating_sum / reviews, 1) if reviews else 0
+        )
+        histograms.append(ProductRatingHistogram(
+            product=product,
+            **{f'rating_{r}': n for r, n in enumerate(counts)}
+        ))
+    ProductReview.objects.bulk_create(review_objects, batch_size=1000)
+    Product.objects.bulk_update(
+        product_objects, ['rating', 'rating_sum', 'rating_count'],
+        batch_size=1000
+    )
+    ProductRatingHistogram.objects.bulk_create(
+        histograms, batch_size=1000, ignore_conflicts=True
+    )
+
+    by_product = {}
+    for variant in variant_objects:
+        by_product.setdefault(variant.product_id, []).append(variant)
+
+    order_objects, line_items = [], []
+    for _ in range(orders if customers else 0):
+        order = Order(
+            user=rng.choice(customers),
+            order_number=generate_order_number(),
+            status=rng.choice(('paid', 'processing', 'shipped')),
+            full_name='Bench Customer',
+            email='bench@example.com',
+            phone_number='000',
+            country='IE',
+            town_or_city='Dublin',
+            street_address1='1 Bench Street',
+        )
+        total = Decimal(0)
+        item_count = 0
+        for product in rng.sample(product_objects, min(3, products)):
+            variant = rng.choice(by_product[product.pk])
+            quantity = rng.randint(1, 3)
+            line_items.append(OrderLineItem(
+                order=order,
+                product=product,
+                product_name=product.name,
+                price=variant.price,
+                size=variant.size,
+                quantity=quantity,
+                lineitem_total=variant.price * quantity,
+            ))
+            total += variant.price * quantity
+            item_count += quantity
+        order.order_total = total
+        order.item_count = item_count
+        order_objects.append(order)
+    Order.objects.bulk_create(order_objects, batch_size=1000)
+    OrderLineItem.objects.bulk_create(line_items, batch_size=1000)
+
+    staff = User.objects.create_superuser(
+        'bench_admin', 'bench_admin@example.com', BENCHMARK_PASSWORD
+    )
+    customer = customers[0] if customers else staff
+    for product in product_objects[:3]:
+        variant = by_product[product.pk][0]
+        CartEntry.objects.create(
+            user=customer, product=product, size=variant.size, quantity=1
+        )
+
+    return {'staff': staff, 'customer': customer}
+
+
+def _login(client, user):
+    '''
+    Log a test client in without the cart merge on login, which needs a
+    request going through the middleware.
+    '''
+    user_logged_in.disconnect(handle_user_login)
+    try:
+        client.force_login(user)
+    finally:
+        user_logged_in.connect(handle_user_login)
+
+
+def get_scenarios(users):
+    '''
+    Return the pages to measure.
+
+    Args:
+        users (dict): The users returned by seed_catalog.
+
+    Returns:
+        list: (name, user or None, url) tuples.
+    '''
+    product = Product.objects.order_by('id').first()
+    scenarios = [('home', None, reverse('home'))]
+    scenarios += [
+        (f'product_list_{mode}', None, f"{reverse('product')}?sort_by={mode}")
+        for mode in SORT_MODES
+    ]
+    if product:
+        scenarios += [
+            ('product_detail', None, product.get_absolute_url()),
+            (
+                'product_detail_admin',
+                users['staff'],
+                product.get_absolute_url()
+            ),
+        ]
+    scenarios += [
+        ('cart', users['customer'], reverse('cart')),
+        ('checkout', users['customer'], reverse('checkout')),
+        ('order_list', users['customer'], reverse('account_orders')),
+    ]
+    for model in admin.site._registry:
+        opts = model._meta
+        scenarios.append((
+            f'admin_{opts.app_label}_{opts.model_name}',
+            users['staff'],
+            reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        ))
+
+    order = Order.objects.order_by('id').first()
+    if order:
+        changelist = reverse('admin:checkout_order_changelist')
+        scenarios += [
+            (
+                'admin_checkout_order_search',
+                users['staff'],
+                f'{changelist}?q={order.order_number[:6]}'
+            ),
+            (
+                'admin_checkout_order_status',
+                users['staff'],
+                f'{changelist}?status__exact=paid'
+            ),
+            (
+                'admin_checkout_order_page_10',
+                users['staff'],
+                f'{changelist}?p=10'
+            ),
+        ]
+    return scenarios
+
+
+def _fake_payment_intent(**kwargs):
+    '''
+    Stand in for Stripe, so checkout is measured without network calls.
+    '''
+    return stripe.PaymentIntent.construct_from({
+        'id': 'pi_benchmark',
+        'client_secret': 'pi_benchmark_secret',
+        'amount': kwargs.get('amount', 0),
+    }, 'sk_benchmark')
+
+
+def measure(scenarios, repeat=5):
+    '''
+    Request every scenario repeat times after one warm-up request.
+
+    Args:
+        scenarios (list): (name, user or None, url) tuples.
+        repeat (int): Number of measured requests per scenario.
+
+    Returns:
+        list: Per scenario, the status code, query count and the
+            median, minimum and maximum wall and database times in ms.
+    '''
+    clients = {}
+    results = []
+
+    with mock.patch.object(
+        stripe.PaymentIntent, 'create', side_effect=_fake_payment_intent
+    ), mock.patch.object(
+        stripe.PaymentIntent, 'retrieve',
+        side_effect=lambda *args, **kwargs: _fake_payment_intent()
+    ):
+        for name, user, url in scenarios:
+            key = user.pk if user else None
+            if key not in clients:
+                # Failing pages are reported with their status code
+                clients[key] = Client(raise_request_exception=False)
+                if user:
+                    _login(clients[key], user)
+            client = clients[key]
+
+            client.get(url, secure=True)
+            wall, db, queries, status = [], [], 0, None
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url, secure=True)
+                    wall.append((time.perf_counter() - started) * 1000)
+                queries = len(context.captured_queries)
+                db.append(sum(
+                    float(query['time']) * 1000
+                    for query in context.captured_queries
+                ))
+                status = response.status_code
+
+            results.append({
+                'name': name,
+                'url': url,
+                'status': status,
+                'queries': queries,
+                'wall_ms': {
+                    'median': round(statistics.median(wall), 2),
+                    'min': round(min(wall), 2),
+                    'max': round(max(wall), 2),
+                },
+                'db_ms': {
+                    'median': round(statistics.median(db), 2),
+                    'min': round(min(db), 2),
+                    'max': round(max(db), 2),
+                },
+            })
+    return results
+
+
+def measure_middleware(iterations=20000):
+    '''
+    Time the access checks of LoginRequiredMiddleware, without a database.
+
+    Cases also record whether the request was redirected, covering views
+    that Django and allauth mark as not requiring login but which stay
+    behind the login here.
+
+    Args:
+        iterations (int): Number of calls per case.
+
+    Returns:
+        list: Per case, the URL, whether it was redirected and the
+            microseconds per request.
+    '''
+    factory = RequestFactory()
+    middleware = LoginRequiredMiddleware(lambda request: None)
+    cases = (
+        ('anonymous_public', AnonymousUser(), reverse('product')),
+        ('anonymous_redirect', AnonymousUser(), reverse('checkout')),
+        ('customer', User(username='customer'), reverse('cart')),
+        (
+            'staff_admin',
+            User(username='staff', is_staff=True),
+            reverse('admin:index')
+        ),
+        ('anonymous_admin_login', AnonymousUser(), reverse('admin:login')),
+        (
+            'anonymous_account_inactive',
+            AnonymousUser(),
+            reverse('account_inactive')
+        ),
+        (
+            'anonymous_reset_from_key_done',
+            AnonymousUser(),
+            reverse('account_reset_password_from_key_done')
+        ),
+        (
+            'anonymous_confirm_login_code',
+            AnonymousUser(),
+            reverse('account_confirm_login_code')
+        ),
+    )
+
+    results = []
+    for name, user, url in cases:
+        request = factory.get(url)
+        request.user = user
+        request.session = {}
+        request._messages = default_storage(request)
+        request.resolver_match = match = resolve(url)
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            response = middleware.process_view(
+                request, match.func, match.args, match.kwargs
+            )
+        elapsed = time.perf_counter() - started
+
+        results.append({
+            'name': name,
+            'url': url,
+            'redirect': response['Location'] if response else None,
+            'us_per_request': round(elapsed / iterations * 1e6, 2),
+        })
+    return results
+
+
+ORDER_NUMBER_SCHEMES = {
+    'uuid_hex': lambda: uuid.uuid4().hex.upper(),
+    'time_ordered': generate_order_number,
+}
+
+
+def measure_order_numbers(orders=1000000, batch=10000, lookups=2000,
+                          seed=0):
+    '''
+    Time inserting orders and looking them up by order number, for each
+    order number scheme.
+
+    Orders are inserted with executemany() into an empty order table,
+    so the times are mostly spent by the database, maintaining the order
+    number index. The table is emptied again after each scheme.
+
+    Args:
+        orders (int): Number of orders inserted per scheme.
+        batch (int): Orders per insert.
+        lookups (int): Number of lookups of random existing orders.
+        seed (int): Seed of the random lookups.
+
+    Returns:
+        list: Per scheme, the insert rate overall and over the last
+            tenth of the orders, and the lookup latency in ms.
+    '''
+    rng = random.Random(seed)
+    quote = connection.ops.quote_name
+    table = quote(Order._meta.db_table)
+
+    # One row of database values, the order number being set per order
+    template = Order(
+        order_number='',
+        full_name='Bench Customer',
+        email='bench@example.com',
+        phone_number='000',
+        country='IE',
+        town_or_city='Dublin',
+        street_address1='1 Bench Street',
+    )
+    fields = [
+        field for field in Order._meta.concrete_fields
+        if not field.primary_key
+    ]
+    row = [
+        field.get_db_prep_save(field.pre_save(template, True), connection)
+        for field in fields
+    ]
+    number_index = [field.name for field in fields].index('order_number')
+    insert = (
+        f"INSERT INTO {table} "
+        f"({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+
+    results = []
+    for name, generate in ORDER_NUMBER_SCHEMES.items():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+
+        sample = []
+        batch_times = []
+        started = time.perf_counter()
+        for offset in range(0, orders, batch):
+            numbers = [
+                generate() for _ in range(min(batch, orders - offset))
+            ]
+            sample.extend(rng.sample(
+                numbers, min(len(numbers), max(1, lookups // 10))
+            ))
+            rows = []
+            for number in numbers:
+                row[number_index] = number
+                rows.append(tuple(row))
+            batch_started = time.perf_counter()
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(insert, rows)
+            batch_times.append(
+                (len(numbers), time.perf_counter() - batch_started)
+            )
+        elapsed = time.perf_counter() - started
+
+        tail = batch_times[-max(1, len(batch_times) // 10):]
+        durations = []
+        for number in rng.sample(sample, min(lookups, len(sample))):
+            lookup_started = time.perf_counter()
+            Order.objects.filter(order_number=number).values_list(
+                'pk', flat=True
+            ).first()
+            durations.append((time.perf_counter() - lookup_started) * 1000)
+        durations.sort()
+
+        results.append({
+            'scheme': name,
+            'orders': orders,
+            'insert_seconds': round(elapsed, 2),
+            'inserts_per_second': round(orders / elapsed),
+            'last_tenth_inserts_per_second': round(
+                sum(n for n, _ in tail) / sum(t for _, t in tail)
+            ),
+            'lookup_p50_ms': round(durations[len(durations) // 2], 3),
+            'lookup_p95_ms': round(
+                durations[int(len(durations) * 0.95)], 3
+            ),
+        })
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+    return results
+
+
+def _timed_request(url):
+    '''
+    Fetch a URL, returning the status code and the seconds it took.
+    '''
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - started
+
+
+def load_test(urls, requests=500, concurrency=20):
+    '''
+    Send concurrent requests to a running server, cycling through URLs.
+
+    Used to compare deployments (e.g. the WSGI and ASGI servers) on the
+    same machine, rather than for absolute numbers.
+
+    Args:
+        urls (list): Absolute URLs to request.
+        requests (int): Total number of requests.
+        concurrency (int): Number of requests in flight at once.
+
+    Returns:
+        dict: The throughput, latency percentiles in ms and the count of
+            failed (non 2xx/3xx or refused) requests.
+    '''
+    targets = [urls[i % len(urls)] for i in range(requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(_timed_request, targets))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(duration * 1000 for _, duration in results)
+
+    def percentile(share):
+        return round(latencies[min(
+            len(latencies) - 1, int(len(latencies) * share)
+        )], 2)
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(requests / elapsed, 1),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'failed': sum(
+            1 for status, _ in results
+            if status is None or status >= 400
+        ),
+    }
+
+
+def run_metadata(sizes, repeat):
+    '''
+    Describe the benchmark run, so saved results can be compared.
+
+    Args:
+        sizes (dict): The catalog sizes used for seeding.
+        repeat (int): Number of measured requests per scenario.
+
+    Returns:
+        dict: The commit, date, database and run parameters.
+    '''
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'created_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'sizes': sizes,
+        'repeat': repeat,
+    }
@@ -0,0 +1,201 @@
+import json
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment
+)
+
+# Internal imports
+from store.benchmark import (
+    get_scenarios,
+    measure,
+    measure_middleware,
+    measure_order_numbers,
+    run_metadata,
+    seed_catalog
+)
+
+
+class Command(BaseCommand):
+    '''
+    Measure query counts and response times of the main pages against a
+    seeded synthetic catalog.
+
+    The benchmark runs in a separate test database that is created and
+    destroyed by the command, so existing data is never touched.
+    '''
+    help = 'Benchmark the main views against a synthetic catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument(
+            '--variants', type=int, default=3,
+            help='Sizes per product (at most 7).'
+        )
+        parser.add_argument(
+            '--reviews', type=int, default=10,
+            help='Reviews per product.'
+        )
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--orders', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Measured requests per page.'
+        )
+        parser.add_argument(
+            '--middleware', action='store_true',
+            help='Only time the access checks of the login middleware.'
+        )
+        parser.add_argument(
+            '--order-numbers', type=int, metavar='ORDERS',
+            help=(
+                'Only time inserting and looking up this many orders per '
+                'order number scheme.'
+            )
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Print the difference with results saved by --output.'
+        )
+
+    def handle(self, *args, **options):
+        if options['middleware']:
+            return self.handle_middleware(options)
+        if options['order_numbers']:
+            return self.handle_order_numbers(options)
+
+        if not 1 <= options['variants'] <= 7:
+            raise CommandError('--variants must be between 1 and 7.')
+
+        baseline = {}
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as file:
+                    baseline = {
+                        result['name']: result
+                        for result in json.load(file)['results']
+                    }
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(
+                    f"Could not read {options['compare']}: {e}"
+                )
+
+        sizes = {
+            key: options[key] for key in (
+                'categories', 'products', 'variants', 'reviews', 'users',
+                'orders', 'seed'
+            )
+        }
+
+        setup_test_environment()
+        databases = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'}
+        )
+        try:
+            started = time.perf_counter()
+            users = seed_catalog(**sizes)
+            self.stdout.write(
+                f'Seeded catalog in {time.perf_counter() - started:.1f}s.'
+            )
+            results = measure(get_scenarios(users), options['repeat'])
+            report = {
+                'meta': run_metadata(sizes, options['repeat']),
+                'results': results,
+            }
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'page':<40}{'status':>7}{'queries':>9}"
+            f"{'wall ms':>10}{'db ms':>9}"
+        )
+        for result in results:
+            line = (
+                f"{result['name']:<40}{result['status']:>7}"
+                f"{result['queries']:>9}"
+                f"{result['wall_ms']['median']:>10.1f}"
+                f"{result['db_ms']['median']:>9.1f}"
+            )
+            previous = baseline.get(result['name'])
+            if previous:
+                queries = result['queries'] - previous['queries']
+                wall = (
+                    result['wall_ms']['median'] -
+                    previous['wall_ms']['median']
+                )
+                line += f'  ({queries:+d} queries, {wall:+.1f} ms)'
+            self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f"Results written to {options['output']}.")
+            )
+
+    def handle_middleware(self, options):
+        '''
+        Report the per-request cost of the login middleware checks.
+        '''
+        results = measure_middleware()
+        for result in results:
+            self.stdout.write(
+                f"{result['name']:<40}{result['us_per_request']:>8.2f} us"
+                f"  {result['redirect'] or 'allowed'}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': run_metadata({}, 0),
+                    'middleware': results
+                }, file, indent=2)
+
+    def handle_order_numbers(self, options):
+        '''
+        Report the insert and lookup throughput of each order number
+        scheme, in a separate test database.
+        '''
+        setup_test_environment()
+        databases = setup_databases(
+            verbosity=0, interactive=False, aliases={'default'}
+        )
+        try:
+            results = measure_order_numbers(
+                options['order_numbers'], seed=options['seed']
+            )
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f"{'scheme':<16}{'inserts/s':>12}{'last 10%/s':>12}"
+            f"{'lookup p50 ms':>15}{'p95 ms':>9}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['scheme']:<16}"
+                f"{result['inserts_per_second']:>12}"
+                f"{result['last_tenth_inserts_per_second']:>12}"
+                f"{result['lookup_p50_ms']:>15.3f}"
+                f"{result['lookup_p95_ms']:>9.3f}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': run_metadata(
+                        {'orders': options['order_numbers']}, 0
+                    ),
+                    'order_numbers': results
+                }, file, indent=2)
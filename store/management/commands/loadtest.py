@@ -0,0 +1,68 @@
+import json
+
+# Django imports
+from django.core.management.base import BaseCommand, CommandError
+
+# Internal imports
+from store.benchmark import load_test, run_metadata
+
+
+class Command(BaseCommand):
+    '''
+    Measure the throughput of a running server, e.g. to compare the WSGI
+    (gunicorn coffee_hub.wsgi) and ASGI (uvicorn coffee_hub.asgi)
+    deployments against the same database.
+    '''
+    help = 'Send concurrent requests to a running server.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'base_url',
+            help='Server to test, e.g. http://127.0.0.1:8000.'
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Path to request, repeatable (default: / and /products/).'
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--label',
+            help='Name of the deployment, saved with the results.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this JSON file.'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError(
+                '--requests and --concurrency must be positive.'
+            )
+
+        base_url = options['base_url'].rstrip('/')
+        paths = options['paths'] or ['/', '/products/']
+        result = load_test(
+            [f'{base_url}{path}' for path in paths],
+            options['requests'],
+            options['concurrency']
+        )
+
+        self.stdout.write(
+            f"{options['label'] or base_url}: "
+            f"{result['requests_per_second']} req/s, "
+            f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"p99 {result['p99_ms']} ms, {result['failed']} failed"
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'meta': run_metadata({
+                        'label': options['label'],
+                        'base_url': base_url,
+                        'paths': paths,
+                    }, 0),
+                    'result': result,
+                }, file, indent=2)
@@ -0,0 +1,181 @@
+import json
+import logging
+import logging.handlers
+import random
+from contextlib import ExitStack
+
+# Django imports
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Third-party imports
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async
+)
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# Internal imports
+from .profiling import install_hooks, sql_wrapper, start_profile, stop_profile
+
+logger = logging.getLogger('store.profiling')
+
+
+class ProfilingMiddleware:
+    '''
+    Opt-in middleware profiling each request: wall time, SQL count and
+    time, duplicate queries, template render time and time spent calling
+    Stripe, SMTP and Cloudinary.
+
+    Enabled by the PROFILING_ENABLED setting, and removed from the
+    middleware chain otherwise. Timings are sent in a Server-Timing header
+    to staff users (to everyone when DEBUG is on), and a sample of the
+    requests, set by PROFILING_SAMPLE_RATE, is written as JSON lines to
+    PROFILING_LOG_FILE. Requests slower than PROFILING_SLOW_MS are always
+    written.
+
+    The middleware is sync-only, so under ASGI requests are handled in a
+    thread while profiling is enabled.
+    '''
+
+    def __init__(self, get_response):
+        '''
+        Initializes the middleware with the provided response handler.
+
+        Args:
+            get_response (function): The next middleware or view in the chain.
+
+        Raises:
+            MiddlewareNotUsed: If profiling is disabled.
+        '''
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 1.0)
+        self.slow_ms = getattr(settings, 'PROFILING_SLOW_MS', 0)
+
+        log_file = getattr(settings, 'PROFILING_LOG_FILE', None)
+        if log_file and not logger.handlers:
+            handler = logging.handlers.WatchedFileHandler(log_file)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        self.log_enabled = bool(log_file)
+
+        install_hooks()
+
+    def __call__(self, request):
+        '''
+        Profile the request and report its timings.
+
+        Args:
+            request (HttpRequest): The HTTP request being processed.
+
+        Returns:
+            HttpResponse: The response, with a Server-Timing header when
+            the user may see it.
+        '''
+        profile, token = start_profile()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            stop_profile(token)
+
+        summary = profile.summary()
+
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response['Server-Timing'] = self.server_timing(summary)
+
+        if self.log_enabled and (
+            random.random() < self.sample_rate or
+            (self.slow_ms and summary['wall_ms'] >= self.slow_ms)
+        ):
+            summary.update(
+                method=request.method,
+                path=request.path,
+                status=response.status_code
+            )
+            logger.info(json.dumps(summary))
+
+        return response
+
+    @staticmethod
+    def server_timing(summary):
+        '''
+        Format the timings of a request as a Server-Timing header value.
+
+        Args:
+            summary (dict): The profile summary.
+
+        Returns:
+            str: The header value.
+        '''
+        metrics = [
+            f"total;dur={summary['wall_ms']}",
+            f"sql;dur={summary['sql_ms']};"
+            f"desc=\"{summary['sql_count']} queries, "
+            f"{summary['duplicate_queries']} duplicates\"",
+            f"tpl;dur={summary['template_ms']};desc=\"Templates\"",
+        ]
+        for name, call in summary['external'].items():
+            metrics.append(
+                f"{name};dur={call['ms']};desc=\"{call['calls']} calls\""
+            )
+        return ', '.join(metrics)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    '''
+    WhiteNoise, able to run in an async middleware stack.
+
+    WhiteNoiseMiddleware is sync-only, which makes Django run every ASGI
+    request in a thread. Under ASGI this version looks static files up
+    in WhiteNoise's in-memory table on the event loop, and only serves
+    the files themselves from a thread.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        '''
+        Initializes WhiteNoise and picks the sync or async mode of the
+        rest of the stack.
+        '''
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        '''
+        Serve static files, passing other requests on.
+        '''
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        '''
+        Async version of __call__.
+        '''
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(
+                self.serve, thread_sensitive=False
+            )(static_file, request)
+        return await self.get_response(request)
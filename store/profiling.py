@@ -0,0 +1,228 @@
+import functools
+import time
+from collections import Counter
+from contextvars import ContextVar
+from importlib import import_module
+
+# Django imports
+from django.utils.module_loading import import_string
+
+# Calls to external services timed by the profiler, by name. Each value is
+# the dotted path of a function or method all calls to the service go
+# through; paths that cannot be imported are skipped.
+EXTERNAL_CALLS = {
+    'stripe': 'stripe._http_client.HTTPClient.request_with_retries',
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend.send_messages',
+    'cloudinary': 'cloudinary.uploader.call_api',
+}
+
+# Profile of the request being handled, if it is profiled
+_current_profile = ContextVar('request_profile', default=None)
+
+_installed_hooks = set()
+
+
+class RequestProfile:
+    '''
+    Timings collected while handling one request.
+
+    Attributes:
+        sql_count (int): Number of queries run.
+        sql_time (float): Seconds spent running queries.
+        queries (Counter): Runs per (sql, params) pair.
+        statements (Counter): Runs per SQL statement, whatever the params.
+        template_time (float): Seconds spent rendering templates.
+        external (dict): Per external service, the number of calls and
+            the seconds spent in them.
+    '''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.queries = Counter()
+        self.statements = Counter()
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.external = {}
+
+    @property
+    def duplicate_queries(self):
+        '''
+        Return the number of queries repeating an earlier query with the
+        same parameters.
+        '''
+        return sum(count - 1 for count in self.queries.values())
+
+    def repeated_statements(self, limit=5):
+        '''
+        Return the statements run more than once, most repeated first.
+        Statements repeated with varying parameters usually point at an
+        N+1 query pattern.
+
+        Args:
+            limit (int): Maximum number of statements returned.
+
+        Returns:
+            list: (sql, count) pairs.
+        '''
+        return [
+            (sql, count)
+            for sql, count in self.statements.most_common(limit)
+            if count > 1
+        ]
+
+    def record_external(self, name, duration):
+        '''
+        Add a call to an external service.
+
+        Args:
+            name (str): The service name.
+            duration (float): Seconds spent in the call.
+        '''
+        calls, total = self.external.get(name, (0, 0.0))
+        self.external[name] = (calls + 1, total + duration)
+
+    def summary(self):
+        '''
+        Return the collected timings, durations in milliseconds.
+
+        Returns:
+            dict: The wall, SQL, template and external call timings and
+                the duplicate and repeated queries.
+        '''
+        wall = time.perf_counter() - self.started
+        return {
+            'wall_ms': round(wall * 1000, 2),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'duplicate_queries': self.duplicate_queries,
+            'repeated_statements': self.repeated_statements(),
+            'template_ms': round(self.template_time * 1000, 2),
+            'external': {
+                name: {'calls': calls, 'ms': round(total * 1000, 2)}
+                for name, (calls, total) in self.external.items()
+            },
+        }
+
+
+def start_profile():
+    '''
+    Start profiling the current request.
+
+    Returns:
+        tuple: The new profile and the token to pass to stop_profile.
+    '''
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def stop_profile(token):
+    '''
+    Stop profiling the current request.
+
+    Args:
+        token: The token returned by start_profile.
+    '''
+    _current_profile.reset(token)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    '''
+    Database execute wrapper timing the queries of profiled requests.
+    '''
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.sql_time += time.perf_counter() - started
+        profile.sql_count += 1
+        profile.statements[sql] += 1
+        try:
+            profile.queries[(sql, repr(params))] += 1
+        except TypeError:
+            pass
+
+
+def _timed_template_render(render):
+    '''
+    Wrap a template render method to add its duration to the profile.
+    Nested renders are only counted once.
+    '''
+    @functools.wraps(render)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return render(*args, **kwargs)
+
+        started = time.perf_counter()
+        profile.template_depth += 1
+        try:
+            return render(*args, **kwargs)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - started
+    return wrapper
+
+
+def _timed_external_call(name, call):
+    '''
+    Wrap a function calling an external service to add its duration to
+    the profile.
+    '''
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profile.record_external(name, time.perf_counter() - started)
+    return wrapper
+
+
+def _patch(path, wrap):
+    '''
+    Replace the function at a dotted path with a wrapped version, once.
+    '''
+    if path in _installed_hooks:
+        return
+    owner_path, attribute = path.rsplit('.', 1)
+    try:
+        owner = import_module(owner_path)
+    except ImportError:
+        try:
+            owner = import_string(owner_path)
+        except ImportError:
+            return
+    if not hasattr(owner, attribute):
+        return
+    setattr(owner, attribute, wrap(getattr(owner, attribute)))
+    _installed_hooks.add(path)
+
+
+def install_hooks(external_calls=None):
+    '''
+    Time template rendering and external calls of profiled requests.
+
+    Only called when profiling is enabled, so the application runs
+    unpatched otherwise.
+
+    Args:
+        external_calls (dict): Dotted paths of external calls by service
+            name, defaulting to EXTERNAL_CALLS.
+    '''
+    _patch(
+        'django.template.backends.django.Template.render',
+        _timed_template_render
+    )
+    for name, path in (external_calls or EXTERNAL_CALLS).items():
+        _patch(path, functools.partial(_timed_external_call, name))
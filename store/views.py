@@ -7,6 +7,7 @@ from django.contrib import messages
 from django.templatetags.static import static
 
 # Internal imports
+from product.recommendations import get_top_sellers
 from product.views import ProductListView
 from .forms import ContactForm
 
@@ -46,6 +47,15 @@ class HomeView(ProductListView):
 
         context['fallback_image'] = static('images/hero.webp')
 
+        context['top_sellers'] = [
+            {
+                'product': product,
+                'image': product.image('list'),
+                'image_srcset': product.image_srcset('list'),
+            }
+            for product in get_top_sellers()
+        ]
+
         return context
 
 